@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compilador de regras: encadeamentos, ciclos e grupos de passada única
+
+Carrega as regras dos pacotes de `rules/` (padrão: o pacote `pipeline`,
+que inclui todos os demais), detecta regras cuja
+saída casa com a entrada de outra, reporta ciclos e pares dependentes de
+ordem, e monta os maiores grupos fundidos comprovadamente equivalentes à
+aplicação sequencial.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+from oxy_transform import apply_groups, apply_sequential, compile_rules, load_pipeline
+
+IGNORE_DIRS = {'node_modules', '.git', 'dist', 'build', '.next', 'coverage', '__pycache__'}
+EXTENSIONS = {'.md', '.ts', '.tsx', '.js', '.jsx', '.json', '.html', '.css', '.txt', '.yml', '.yaml'}
+
+
+def verify(groups, rules, base_dir: Path):
+    """Compara grupos fundidos com a aplicação sequencial em arquivos reais"""
+    checked = 0
+    mismatches = []
+    for root, dirs, files in os.walk(base_dir):
+        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+        for file in files:
+            file_path = Path(root) / file
+            if file_path.suffix not in EXTENSIONS:
+                continue
+            try:
+                content = file_path.read_text(encoding='utf-8')
+            except (UnicodeDecodeError, OSError):
+                continue
+            checked += 1
+            if apply_sequential(rules, content) != apply_groups(groups, content)[0]:
+                mismatches.append(str(file_path.relative_to(base_dir)))
+    return checked, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analisa e funde as regras dos pacotes de transformação')
+    parser.add_argument('packs', nargs='*', help='Pacotes de rules/ a considerar (padrão: pipeline)')
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    parser.add_argument('--all', action='store_true', help='Lista todos os pares dependentes de ordem')
+    parser.add_argument('--verify', type=Path, metavar='DIR',
+                        help='Confere os grupos contra a aplicação sequencial nos arquivos de DIR')
+    args = parser.parse_args()
+
+    rules = load_pipeline(args.packs or None)
+    analysis = compile_rules(rules)
+    ids = [rule.id for rule in rules]
+    mutual = sorted((a, b) for a, b in analysis.chains if a < b and (b, a) in analysis.chains)
+
+    if args.json:
+        print(json.dumps({
+            'rules': len(rules),
+            'chains': sorted([ids[a], ids[b]] for a, b in analysis.chains),
+            'cycles': [[ids[i] for i in cycle] for cycle in analysis.cycles],
+            'mutual': [[ids[a], ids[b]] for a, b in mutual],
+            'order_dependent': [[ids[a], ids[b], reason] for a, b, reason in analysis.order_dependent],
+            'groups': [group.ids for group in analysis.groups],
+        }, ensure_ascii=False, indent=2))
+    else:
+        print("=" * 60)
+        print("🧩 Compilador de Regras")
+        print("=" * 60)
+        print(f"\n📚 Regras carregadas: {len(rules)}")
+        print(f"🔗 Encadeamentos (saída → entrada): {len(analysis.chains)}")
+        print(f"⚠️  Pares dependentes de ordem: {len(analysis.order_dependent)}")
+
+        print(f"\n🔁 Ciclos diretos (A alimenta B e B alimenta A): {len(mutual)}")
+        for a, b in mutual:
+            print(f"   {ids[a]} ⇄ {ids[b]}")
+        for cycle in analysis.cycles:
+            print(f"   componente com {len(cycle)} regras: {ids[cycle[0]]} ... {ids[cycle[-1]]}")
+
+        pairs = analysis.order_dependent if args.all else [
+            pair for pair in analysis.order_dependent if 'encadeia' in pair[2].split('+')]
+        label = "Pares dependentes de ordem" if args.all else "Encadeamentos na ordem do pipeline"
+        print(f"\n📋 {label}:")
+        for a, b, reason in pairs:
+            print(f"   {ids[a]} → {ids[b]} ({reason})")
+
+        print(f"\n⚡ Grupos de passada única: {len(analysis.groups)} (antes: {len(rules)} passadas)")
+        for number, group in enumerate(analysis.groups, 1):
+            print(f"   #{number} [{len(group)}] {group.ids[0]}" + (f" ... {group.ids[-1]}" if len(group) > 1 else ""))
+
+    if args.verify:
+        checked, mismatches = verify(analysis.groups, rules, args.verify)
+        print(f"\n🔍 Verificação: {checked} arquivos, {len(mismatches)} divergências")
+        for path in mismatches:
+            print(f"   ❌ {path}")
+        if mismatches:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,56 +3,35 @@
 Script completo para corrigir todos os problemas no backend
 """
 
-import os
-import re
+import argparse
 from pathlib import Path
 
-# Mapeamento de correções
-REPLACEMENTS = [
-    # PetsService -> PatientsService (class name)
-    (r'\bPetsService\b', 'PatientsService'),
+from oxy_transform.packs import load_bundle
+from oxy_transform.runner import Runner, add_runner_args
 
-    # petsService -> patientsService (instance name)
-    (r'\bpetsService\b', 'patientsService'),
+# Mapeamento de correções (rules/backend-complete.toml)
+REPLACEMENTS = load_bundle('backend-complete')
 
-    # oxy_assistant -> oxy-assistant em middleware
-    (r"oxy_assistant-auth\.middleware", "oxy-assistant-auth.middleware"),
-
-    # oxy_assistant -> oxy-assistant em context builder
-    (r"oxy_assistant-context-builder\.service", "oxy-assistant-context-builder.service"),
-]
-
-def fix_file(filepath):
+def fix_file(filepath, content):
     """Corrige todas as substituições em um arquivo"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        original = content
-
-        for pattern, replacement in REPLACEMENTS:
-            content = re.sub(pattern, replacement, content)
-
-        if content != original:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-
-        return False
-    except Exception as e:
-        print(f"Error fixing {filepath}: {e}")
-        return False
+    content, hits = REPLACEMENTS.apply(content)
+    return content, sum(hits.values()), hits
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    add_runner_args(parser)
+    args = parser.parse_args()
+
     backend_dir = Path(__file__).parent / 'backend' / 'src'
 
-    fixed_count = 0
-    for filepath in backend_dir.rglob('*.ts'):
-        if fix_file(filepath):
-            print(f"✓ Fixed: {filepath.relative_to(backend_dir)}")
-            fixed_count += 1
+    runner = Runner.from_args(args, backend_dir, fix_file,
+                              label=lambda result: f"✓ Fixed: {result.path}",
+                              line_local=lambda path: REPLACEMENTS.line_local,
+                              cache_key=lambda path: REPLACEMENTS.pack.digest)
+    summary = runner.run(backend_dir.rglob('*.ts'))
+    runner.close()
 
-    print(f"\n✅ Fixed {fixed_count} files")
+    print(f"\n✅ Fixed {summary.changed} files", file=runner.out)
 
 if __name__ == '__main__':
     main()
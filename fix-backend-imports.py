@@ -3,56 +3,35 @@
 Script para corrigir imports incorretos no backend
 """
 
-import os
-import re
+import argparse
 from pathlib import Path
 
-# Mapeamento de correções
-FIXES = [
-    # oxy_assistant -> oxy-assistant
-    (r"from ['\"](.*)oxy_assistant(.*)\.js['\"]", r"from '\1oxy-assistant\2.js'"),
-    (r"from ['\"](.*)oxy_assistant(.*)['\"](?!\.js)", r"from '\1oxy-assistant\2'"),
+from oxy_transform.packs import load_bundle
+from oxy_transform.runner import Runner, add_runner_args
 
-    # appointments -> bookings (para services)
-    (r"from ['\"](.*/services/)appointments/appointments\.service\.js['\"]", r"from '\1bookings/bookings.service.js'"),
-    (r"from ['\"](.*/services/)appointments/appointments\.service['\"]", r"from '\1bookings/bookings.service'"),
+# Mapeamento de correções (rules/backend-imports.toml)
+FIXES = load_bundle('backend-imports')
 
-    # Corrigir paths de rotas
-    (r"from ['\"]\.\/routes\/oxy_assistant\.routes\.js['\"]", r"from './routes/oxy-assistant.routes.js'"),
-    (r"from ['\"]\.\/routes\/appointments\.routes\.js['\"]", r"from './routes/bookings.routes.js'"),
-]
-
-def fix_file(filepath):
+def fix_file(filepath, content):
     """Corrige imports em um arquivo"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        original = content
-
-        for pattern, replacement in FIXES:
-            content = re.sub(pattern, replacement, content)
-
-        if content != original:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-
-        return False
-    except Exception as e:
-        print(f"Error fixing {filepath}: {e}")
-        return False
+    content, hits = FIXES.apply(content)
+    return content, sum(hits.values()), hits
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    add_runner_args(parser)
+    args = parser.parse_args()
+
     backend_dir = Path(__file__).parent / 'backend' / 'src'
 
-    fixed_count = 0
-    for filepath in backend_dir.rglob('*.ts'):
-        if fix_file(filepath):
-            print(f"✓ Fixed: {filepath.relative_to(backend_dir)}")
-            fixed_count += 1
+    runner = Runner.from_args(args, backend_dir, fix_file,
+                              label=lambda result: f"✓ Fixed: {result.path}",
+                              line_local=lambda path: FIXES.line_local,
+                              cache_key=lambda path: FIXES.pack.digest)
+    summary = runner.run(backend_dir.rglob('*.ts'))
+    runner.close()
 
-    print(f"\n✅ Fixed {fixed_count} files")
+    print(f"\n✅ Fixed {summary.changed} files", file=runner.out)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,12 @@
+"""
+Utilitários compartilhados pelos scripts de transformação (petshop → clínica)
+"""
+from .compiler import Analysis, FusedGroup, RuleCompiler, apply_groups, apply_sequential, compile_rules
+from .packs import Bundle, Pack, load_bundle, load_pack, load_pipeline
+from .rules import Rule
+
+__all__ = [
+    'Analysis', 'Bundle', 'FusedGroup', 'Pack', 'Rule', 'RuleCompiler',
+    'apply_groups', 'apply_sequential', 'compile_rules',
+    'load_bundle', 'load_pack', 'load_pipeline',
+]
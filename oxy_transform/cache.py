@@ -0,0 +1,316 @@
+"""
+Cache de resultados endereçado por conteúdo
+
+Cada entrada é indexada pelo hash do conteúdo lido junto com o namespace
+da transformação: hash do script e do código do pacote oxy_transform
+(EmojiMap, modo estruturado, compilador...), nome da função e o digest dos
+pacotes de regras usados (Pack.digest). Um branch que mude qualquer um
+deles não reaproveita saídas produzidas pelo código de outro; o mesmo
+arquivo visto em qualquer branch ou clone com o mesmo código vira uma
+consulta em vez de uma transformação. A entrada guarda a saída e as
+contagens por regra; arquivos que não mudam (a maioria) guardam só as
+contagens.
+
+Dois formatos, escolhidos pelo caminho de --cache:
+
+- diretório: um arquivo por entrada (`ab/abcdef….entry`), o mtime marca o
+  último uso; o tamanho total fica em `manifest.json` para a abertura não
+  precisar de um stat por entrada; fácil de persistir com o cache de
+  diretório do CI;
+- arquivo .sqlite/.db: uma tabela só, em WAL, para quem prefere um único
+  arquivo.
+
+A remoção é LRU pelo tamanho total: ao passar do limite, as entradas usadas
+há mais tempo saem até o total cair para EVICT_TARGET do limite (a folga
+evita varrer o cache a cada gravação).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .memory import _mb
+
+# Incrementar quando o formato das entradas mudar (mudanças de código já
+# invalidam o cache pelo source_digest)
+CACHE_VERSION = 1
+EVICT_TARGET = 0.9
+SQLITE_SUFFIXES = {'.sqlite', '.sqlite3', '.db'}
+MANIFEST = 'manifest.json'
+
+# (saída ou None se o conteúdo não mudou, mudanças, {regra: matches})
+Entry = Tuple[Optional[str], int, Dict[str, int]]
+
+
+def file_digest(path: Path) -> str:
+    """Hash de um arquivo (ex.: o próprio script), '' se não existir"""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return ''
+
+
+def source_digest() -> str:
+    """Hash dos fontes de oxy_transform/, que fazem parte de toda transformação"""
+    digest = hashlib.sha256()
+    for source in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(source.name.encode('utf-8') + b'\0' + source.read_bytes() + b'\0')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Base comum: chaves, estatísticas e a política de remoção"""
+
+    def __init__(self, path: Path, max_size: int, namespace: str = ''):
+        self.path = Path(path)
+        self.max_size = max_size
+        self.namespace = namespace
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    def key(self, namespace: str, content: str) -> str:
+        digest = hashlib.sha256(f"{CACHE_VERSION}\0{self.namespace}\0{namespace}\0".encode('utf-8'))
+        digest.update(content.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self.lock:
+            entry = self.load(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, key: str, content: str, output: str, changes: int, rules: Dict[str, int]):
+        header = json.dumps({'changes': changes, 'rules': rules}, ensure_ascii=False).encode('utf-8')
+        data = None if output == content else output.encode('utf-8', 'surrogatepass')
+        with self.lock:
+            self.size += self.store(key, header, data)
+            self.stored += 1
+            if self.size > self.max_size:
+                self.evicted += self.evict(int(self.max_size * EVICT_TARGET))
+
+    def lines(self) -> List[str]:
+        """Resumo do cache ao final da execução"""
+        lookups = self.hits + self.misses
+        rate = f" ({self.hits / lookups:.0%})" if lookups else ''
+        lines = [f"💾 Cache de resultados ({self.path}):",
+                 f"   Acertos: {self.hits}/{lookups}{rate}",
+                 f"   Entradas gravadas: {self.stored}",
+                 f"   Tamanho: {_mb(self.size)} de {_mb(self.max_size)}"]
+        if self.evicted:
+            lines.append(f"   Removidas (LRU): {self.evicted}")
+        return lines
+
+    # ---- formato ----
+
+    def load(self, key: str) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def store(self, key: str, header: bytes, data: Optional[bytes]) -> int:
+        """Grava a entrada; retorna quanto o tamanho total cresceu"""
+        raise NotImplementedError
+
+    def evict(self, target: int) -> int:
+        """Remove as entradas menos usadas até o total caber em `target`"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def _entry(header: bytes, data: Optional[bytes]) -> Entry:
+    meta = json.loads(header)
+    output = data.decode('utf-8', 'surrogatepass') if data is not None else None
+    return output, meta['changes'], meta['rules']
+
+
+class DirectoryCache(ResultCache):
+    """Uma entrada por arquivo: cabeçalho JSON, quebra de linha e a saída"""
+
+    def __init__(self, path: Path, max_size: int, namespace: str = ''):
+        super().__init__(path, max_size, namespace)
+        self.path.mkdir(parents=True, exist_ok=True)
+        size = self.read_manifest()
+        if size is None:
+            # Cache sem manifesto (novo ou de uma versão anterior): uma
+            # varredura só, depois o total segue no manifesto
+            size = sum(size for _, size, _ in self.entries())
+            self.write_manifest(size)
+        self.size = size
+        self.synced = size   # total do manifesto quando foi lido/gravado
+
+    def read_manifest(self) -> Optional[int]:
+        try:
+            manifest = json.loads((self.path / MANIFEST).read_bytes())
+            if manifest['version'] == CACHE_VERSION:
+                return int(manifest['size'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def write_manifest(self, size: int):
+        manifest = self.path / MANIFEST
+        temp = manifest.with_name(f"{MANIFEST}.{os.getpid()}.tmp")
+        try:
+            temp.write_text(json.dumps({'version': CACHE_VERSION, 'size': size}), encoding='utf-8')
+            os.replace(temp, manifest)
+        except OSError:
+            pass  # somente leitura: a próxima abertura varre de novo
+
+    def file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.entry"
+
+    def entries(self) -> List[Tuple[float, int, Path]]:
+        """(último uso, tamanho, caminho) de todas as entradas"""
+        entries = []
+        for shard in os.scandir(self.path):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.entry'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # removida por outro processo
+                    entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return entries
+
+    def load(self, key: str) -> Optional[Entry]:
+        path = self.file(key)
+        try:
+            raw = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        unchanged = raw[:1] == b'-'
+        header, separator, data = raw[unchanged:].partition(b'\n')
+        if not separator:
+            return None  # gravação interrompida
+        try:
+            return _entry(header, None if unchanged else data)
+        except ValueError:
+            return None
+
+    def store(self, key: str, header: bytes, data: Optional[bytes]) -> int:
+        path = self.file(key)
+        # Sem saída (o conteúdo não mudou): '-' antes do cabeçalho
+        raw = header + b'\n' + data if data is not None else b'-' + header + b'\n'
+        try:
+            previous = path.stat().st_size
+        except OSError:
+            previous = 0
+        try:
+            path.parent.mkdir(exist_ok=True)
+            temp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp.write_bytes(raw)
+            os.replace(temp, path)
+        except OSError:
+            return 0  # cache cheio ou somente leitura: segue sem gravar
+        return len(raw) - previous
+
+    def evict(self, target: int) -> int:
+        entries = sorted(self.entries())
+        self.size = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if self.size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self.size -= size
+            removed += 1
+        self.write_manifest(self.size)
+        self.synced = self.size
+        return removed
+
+    def close(self):
+        # Soma só o que esta execução mudou ao total atual do manifesto, que
+        # outro processo usando o mesmo cache pode ter atualizado. O total é
+        # uma estimativa (gravações concorrentes podem se sobrepor); cada
+        # evict() o recalcula a partir das entradas.
+        with self.lock:
+            current = self.read_manifest()
+            base = current if current is not None else self.synced
+            self.write_manifest(max(base + self.size - self.synced, 0))
+            self.synced = self.size
+
+
+class SqliteCache(ResultCache):
+    """Tabela única; `used` marca o último acesso para a remoção LRU"""
+
+    COMMIT_EVERY = 200
+
+    def __init__(self, path: Path, max_size: int, namespace: str = ''):
+        super().__init__(path, max_size, namespace)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # As threads do --jobs usam a mesma conexão, sempre sob self.lock
+        self.db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS results ('
+                        'key TEXT PRIMARY KEY, header BLOB NOT NULL, output BLOB, '
+                        'size INTEGER NOT NULL, used REAL NOT NULL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS results_used ON results(used)')
+        self.db.commit()
+        self.size = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        self.pending = 0
+
+    def load(self, key: str) -> Optional[Entry]:
+        row = self.db.execute('SELECT header, output FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute('UPDATE results SET used = ? WHERE key = ?', (time.time(), key))
+        self.written()
+        return _entry(row[0], row[1])
+
+    def store(self, key: str, header: bytes, data: Optional[bytes]) -> int:
+        size = len(header) + (len(data) if data is not None else 0)
+        row = self.db.execute('SELECT size FROM results WHERE key = ?', (key,)).fetchone()
+        self.db.execute('INSERT OR REPLACE INTO results (key, header, output, size, used) VALUES (?, ?, ?, ?, ?)',
+                        (key, header, data, size, time.time()))
+        self.written()
+        return size - (row[0] if row else 0)
+
+    def written(self):
+        # Um commit por gravação custaria um fsync por arquivo
+        self.pending += 1
+        if self.pending >= self.COMMIT_EVERY:
+            self.db.commit()
+            self.pending = 0
+
+    def evict(self, target: int) -> int:
+        self.size = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        doomed = []
+        for key, size in self.db.execute('SELECT key, size FROM results ORDER BY used'):
+            if self.size <= target:
+                break
+            doomed.append((key,))
+            self.size -= size
+        self.db.executemany('DELETE FROM results WHERE key = ?', doomed)
+        self.db.commit()
+        self.pending = 0
+        return len(doomed)
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+
+def open_cache(path: str, max_size: int, namespace: str = '') -> ResultCache:
+    """Cache em SQLite para caminhos .sqlite/.db, em diretório para o resto"""
+    if Path(path).suffix.lower() in SQLITE_SUFFIXES:
+        return SqliteCache(Path(path), max_size, namespace)
+    return DirectoryCache(Path(path), max_size, namespace)
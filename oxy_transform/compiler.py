@@ -0,0 +1,641 @@
+"""
+Compilador de regras: análise de encadeamento/conflito e fusão em passada única
+
+Os scripts aplicam as regras em sequência, e cada regra enxerga a saída das
+anteriores (ex.: phase3 gera `oxy_assistant`, que fix-backend-complete.py
+reescreve depois). Este módulo:
+
+1. Analisa cada padrão (via sre_parse) em segmentos de linguagem finita
+2. Detecta encadeamentos (saída de A casável por B) e sobreposições
+   (A e B podem casar trechos que se sobrepõem na mesma entrada)
+3. Reporta ciclos no grafo de encadeamento e pares dependentes de ordem
+4. Agrupa regras consecutivas em grupos fundidos (uma regex com alternação)
+   que, comprovadamente, produzem o mesmo resultado da aplicação sequencial
+
+A análise é conservadora: na dúvida, o par é tratado como conflitante e as
+regras ficam em grupos separados.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_c
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants as sre_c
+
+from .rules import Rule
+
+# Limites da enumeração de linguagens finitas
+MAX_LANGUAGE = 256
+MAX_CLASS = 64
+MAX_REPEAT = 4
+
+_WORD = re.compile(r'\w')
+
+
+def _is_word(char: str) -> bool:
+    return bool(_WORD.match(char))
+
+
+@dataclass
+class Shape:
+    """Resumo estrutural de um padrão para a análise de conflitos"""
+    segments: List[FrozenSet[str]] = field(default_factory=list)
+    wild: bool = False          # contém repetição ilimitada (.*, \w+, ...)
+    opaque: bool = False        # não analisável: conflita com tudo
+    fusable: bool = True        # pode entrar em uma alternação
+    lead_boundary: bool = False
+    trail_boundary: bool = False
+    lookaround: bool = False
+    boundaries: bool = False    # usa \b / \B em qualquer posição
+    groups: int = 0
+
+
+@dataclass
+class Output:
+    """Saída de uma regra: trechos literais intercalados com grupos"""
+    pieces: List[str]
+    holes: bool
+
+    @property
+    def first(self) -> Optional[str]:
+        return self.pieces[0][:1] if self.pieces and self.pieces[0] else None
+
+    @property
+    def last(self) -> Optional[str]:
+        return self.pieces[-1][-1:] if self.pieces and self.pieces[-1] else None
+
+
+class _Infinite(Exception):
+    """Elemento cuja linguagem não cabe na enumeração"""
+
+
+def _product(left: Set[str], right: Set[str]) -> Set[str]:
+    result = {a + b for a in left for b in right}
+    if len(result) > MAX_LANGUAGE:
+        raise _Infinite
+    return result
+
+
+def _class_chars(items) -> Set[str]:
+    """Caracteres de uma classe [..] pequena e não negada"""
+    chars = set()
+    for op, av in items:
+        if op is sre_c.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_c.RANGE and av[1] - av[0] < MAX_CLASS:
+            chars.update(chr(c) for c in range(av[0], av[1] + 1))
+        else:
+            raise _Infinite
+    if len(chars) > MAX_CLASS:
+        raise _Infinite
+    return chars
+
+
+def _language(items, shape: Shape) -> Set[str]:
+    """Enumera a linguagem finita de uma sequência de elementos"""
+    strings = {''}
+    for op, av in items:
+        if op is sre_c.LITERAL:
+            strings = _product(strings, {chr(av)})
+        elif op is sre_c.IN:
+            strings = _product(strings, _class_chars(av))
+        elif op is sre_c.BRANCH:
+            union = set()
+            for branch in av[1]:
+                union |= _language(branch, shape)
+            strings = _product(strings, union)
+        elif op is sre_c.SUBPATTERN:
+            if av[1] & sre_c.SRE_FLAG_IGNORECASE:
+                raise _Infinite
+            strings = _product(strings, _language(av[-1], shape))
+        elif op in (sre_c.MAX_REPEAT, sre_c.MIN_REPEAT):
+            low, high, sub = av
+            if high is sre_c.MAXREPEAT or high > MAX_REPEAT:
+                raise _Infinite
+            inner = _language(sub, shape)
+            options, current = set(), {''}
+            for count in range(high + 1):
+                if count >= low:
+                    options |= current
+                current = _product(current, inner)
+            strings = _product(strings, options)
+        elif op is sre_c.AT:
+            # Asserções só restringem a linguagem: ignorá-las é conservador
+            if av in (sre_c.AT_BOUNDARY, sre_c.AT_NON_BOUNDARY):
+                shape.boundaries = True
+        elif op in (sre_c.ASSERT, sre_c.ASSERT_NOT):
+            shape.lookaround = True
+        else:
+            # ANY, NOT_LITERAL, CATEGORY, GROUPREF, ...
+            raise _Infinite
+    return strings
+
+
+def _flatten(items):
+    """Expande subgrupos para que segmentos atravessem parênteses"""
+    for op, av in items:
+        if op is sre_c.SUBPATTERN:
+            if av[1] & sre_c.SRE_FLAG_IGNORECASE:
+                raise _Infinite
+            yield from _flatten(av[-1])
+        else:
+            yield op, av
+
+
+def analyze(rule: Rule) -> Shape:
+    """Quebra o padrão em segmentos finitos separados por curingas"""
+    shape = Shape()
+    if rule.kind == 'literal':
+        shape.segments = [frozenset({rule.pattern})]
+        return shape
+
+    try:
+        parsed = sre_parse.parse(rule.pattern, rule.flags)
+    except re.error:
+        shape.opaque = shape.fusable = False
+        return shape
+
+    shape.groups = parsed.state.groups - 1
+    global_flags = parsed.state.flags & ~(sre_c.SRE_FLAG_UNICODE)
+    if global_flags or rule.flags or parsed.state.groupdict:
+        shape.fusable = False
+    if global_flags & sre_c.SRE_FLAG_IGNORECASE:
+        shape.opaque = True
+        return shape
+
+    try:
+        items = list(_flatten(parsed))
+    except _Infinite:
+        shape.opaque = True
+        return shape
+    # \b nas pontas só vale para o segmento se ele estiver colado à ponta
+    if len(items) > 1 and items[0] == (sre_c.AT, sre_c.AT_BOUNDARY) and not _is_wild(items[1]):
+        shape.lead_boundary = True
+    if len(items) > 1 and items[-1] == (sre_c.AT, sre_c.AT_BOUNDARY) and not _is_wild(items[-2]):
+        shape.trail_boundary = True
+
+    current: List = []
+    try:
+        for op, av in items:
+            if op is sre_c.GROUPREF:
+                shape.fusable = False
+            if not _is_wild((op, av)):
+                current.append((op, av))
+                continue
+            if op in (sre_c.BRANCH, sre_c.ASSERT, sre_c.ASSERT_NOT) or (
+                    op in (sre_c.MAX_REPEAT, sre_c.MIN_REPEAT) and _has_structure(av[2])):
+                shape.opaque = True
+                return shape
+            shape.wild = True
+            if current:
+                shape.segments.append(frozenset(_language(current, shape)))
+                current = []
+        if current or not shape.segments:
+            shape.segments.append(frozenset(_language(current, shape)))
+    except _Infinite:
+        shape.opaque = True
+        return shape
+    shape.segments = [seg for seg in shape.segments if seg != frozenset({''})] or shape.segments
+    return shape
+
+
+def _has_structure(items) -> bool:
+    """Repetição sobre algo além de um único caractere/classe"""
+    return len(items) != 1 or items[0][0] in (sre_c.SUBPATTERN, sre_c.BRANCH)
+
+
+_TEMPLATE = re.compile(r'\\(?:g<([^>]*)>|(\d{1,2})|(.))', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v', 'a': '\a', 'b': '\b', '\\': '\\'}
+
+
+def parse_output(rule: Rule) -> Output:
+    """Separa a substituição em trechos literais e referências a grupos"""
+    if rule.kind == 'literal':
+        return Output([rule.replacement], False)
+    pieces, current, holes = [], [], False
+    position = 0
+    for match in _TEMPLATE.finditer(rule.replacement):
+        current.append(rule.replacement[position:match.start()])
+        position = match.end()
+        if match.group(3) is not None:
+            current.append(_ESCAPES.get(match.group(3), '\\' + match.group(3)))
+            continue
+        holes = True
+        pieces.append(''.join(current))
+        current = []
+    current.append(rule.replacement[position:])
+    pieces.append(''.join(current))
+    return Output(pieces, holes)
+
+
+def _touches(text: str, run: str, lead: bool = False, trail: bool = False,
+             before: Optional[Set[bool]] = None, after: Optional[Set[bool]] = None) -> bool:
+    """
+    `run` (parte de um match) pode se sobrepor a uma região cujo conteúdo é
+    exatamente `text`?
+    `lead`/`trail` indicam \\b imediatamente antes/depois de `run`;
+    `before`/`after` restringem o tipo (palavra ou não) do caractere vizinho
+    a `text` (None = qualquer contexto).
+    """
+    if not text or not run:
+        return False
+
+    def boundary_ok(at: int) -> bool:
+        # \b em `at` dentro de `text`; nas pontas o contexto é livre
+        if at <= 0 or at >= len(text):
+            return True
+        return _is_word(text[at - 1]) != _is_word(text[at])
+
+    def context_ok(allowed: Optional[Set[bool]], char: str) -> bool:
+        return allowed is None or _is_word(char) in allowed
+
+    # text inteiro dentro de run
+    start = run.find(text)
+    while start != -1:
+        end = start + len(text)
+        if (start == 0 or context_ok(before, run[start - 1])) and \
+                (end == len(run) or context_ok(after, run[end])):
+            return True
+        start = run.find(text, start + 1)
+
+    # run inteiro dentro de text
+    start = text.find(run)
+    while start != -1:
+        if (not lead or boundary_ok(start)) and (not trail or boundary_ok(start + len(run))):
+            return True
+        start = text.find(run, start + 1)
+
+    for size in range(1, min(len(text), len(run))):
+        # sufixo de text == prefixo de run: run começa dentro de text
+        if text.endswith(run[:size]) and (not lead or boundary_ok(len(text) - size)) \
+                and context_ok(after, run[size]):
+            return True
+        # prefixo de text == sufixo de run: run termina dentro de text
+        if text.startswith(run[-size:]) and (not trail or boundary_ok(size)) \
+                and context_ok(before, run[-size - 1]):
+            return True
+    return False
+
+
+def _edge_words(strings) -> Tuple[Set[bool], Set[bool]]:
+    firsts = {_is_word(s[0]) for s in strings if s}
+    lasts = {_is_word(s[-1]) for s in strings if s}
+    return firsts, lasts
+
+
+@dataclass
+class Analysis:
+    """Resultado da compilação de uma lista ordenada de regras"""
+    rules: List[Rule]
+    chains: Set[Tuple[int, int]]
+    overlaps: Set[Tuple[int, int]]
+    cycles: List[List[int]]
+    order_dependent: List[Tuple[int, int, str]]
+    groups: List['FusedGroup']
+
+
+class RuleCompiler:
+    """Analisa interações entre regras e monta grupos de passada única"""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = list(rules)
+        self.shapes = [analyze(rule) for rule in self.rules]
+        self.outputs = [parse_output(rule) for rule in self.rules]
+
+    def _segment_runs(self, index: int):
+        """(string, \\b antes, \\b depois) para cada string de cada segmento"""
+        shape = self.shapes[index]
+        last = len(shape.segments) - 1
+        for position, segment in enumerate(shape.segments):
+            lead = shape.lead_boundary and position == 0
+            trail = shape.trail_boundary and position == last
+            for text in segment:
+                yield text, lead, trail
+
+    def _edges_stable(self, index: int) -> bool:
+        """A saída preserva o tipo (palavra/não-palavra) das bordas da entrada?"""
+        shape, output = self.shapes[index], self.outputs[index]
+        if shape.opaque or not shape.segments or output.first is None or output.last is None:
+            return False
+        firsts, _ = _edge_words(shape.segments[0])
+        _, lasts = _edge_words(shape.segments[-1])
+        if shape.wild:
+            # segmentos das pontas podem não ser as pontas do match
+            rule = self.rules[index]
+            items = list(_flatten(sre_parse.parse(rule.pattern, rule.flags)))
+            edges = [item for item in items if item[0] is not sre_c.AT]
+            if not edges or _is_wild(edges[0]) or _is_wild(edges[-1]):
+                return False
+        return firsts == {_is_word(output.first)} and lasts == {_is_word(output.last)}
+
+    def _context(self, index: int) -> Tuple[Optional[Set[bool]], Optional[Set[bool]]]:
+        """Tipo garantido dos vizinhos de um match, deduzido dos \\b das pontas"""
+        shape = self.shapes[index]
+        if shape.opaque or not shape.segments:
+            return None, None
+        firsts, _ = _edge_words(shape.segments[0])
+        _, lasts = _edge_words(shape.segments[-1])
+        before = {not firsts.pop()} if shape.lead_boundary and len(firsts) == 1 else None
+        after = {not lasts.pop()} if shape.trail_boundary and len(lasts) == 1 else None
+        return before, after
+
+    def chains_into(self, a: int, b: int, context: bool = True) -> bool:
+        """
+        A saída da regra `a` pode ser casada (total ou parcialmente) por `b`?
+        Com `context`, usa os vizinhos garantidos pelos \\b de `a`; isso só
+        vale se nenhuma regra intermediária mudar o tipo desses vizinhos.
+        """
+        if a == b:
+            return False
+        shape_b = self.shapes[b]
+        if shape_b.opaque or self.shapes[a].opaque:
+            return True
+        if shape_b.lookaround:
+            return True
+        if (shape_b.boundaries or shape_b.lead_boundary or shape_b.trail_boundary) \
+                and not self._edges_stable(a):
+            return True
+        pieces = self.outputs[a].pieces
+        if not all(pieces):
+            # Remoção (ou grupo sem literal ao lado): o texto vizinho se junta e
+            # a emenda pode formar um match novo para qualquer regra ('a-c' sem
+            # o '-' vira 'ac')
+            return True
+        before, after = self._context(a) if context else (None, None)
+        last = len(pieces) - 1
+        for text, lead, trail in self._segment_runs(b):
+            if not text:
+                return True
+            for position, piece in enumerate(pieces):
+                if _touches(piece, text, lead, trail,
+                            before if position == 0 else None,
+                            after if position == last else None):
+                    return True
+        return False
+
+    def overlaps(self, a: int, b: int) -> bool:
+        """As regras podem casar trechos sobrepostos da mesma entrada?"""
+        shape_a, shape_b = self.shapes[a], self.shapes[b]
+        if shape_a.opaque or shape_b.opaque or shape_a.wild or shape_b.wild:
+            return True
+        before_a, after_a = self._context(a)
+        before_b, after_b = self._context(b)
+        for text_a, lead_a, trail_a in self._segment_runs(a):
+            for text_b, lead_b, trail_b in self._segment_runs(b):
+                if not text_a or not text_b:
+                    return True
+                if _touches(text_a, text_b, lead_b, trail_b, before_a, after_a) and \
+                        _touches(text_b, text_a, lead_a, trail_a, before_b, after_b):
+                    return True
+        return False
+
+    def compile(self) -> Analysis:
+        """Calcula encadeamentos, ciclos, pares dependentes e grupos fundidos"""
+        count = len(self.rules)
+        pairs = [(a, b) for a in range(count) for b in range(count) if a != b]
+        chains = {(a, b) for a, b in pairs if self.chains_into(a, b)}
+        strict = {(a, b) for a, b in pairs if a < b and ((a, b) in chains or self.chains_into(a, b, False))}
+        overlaps = {(a, b) for a, b in pairs if a < b and self.overlaps(a, b)}
+        stable = [self._edges_stable(index) for index in range(count)]
+
+        order_dependent = []
+        for a, b in pairs:
+            if a > b:
+                continue
+            reasons = []
+            if (a, b) in chains:
+                reasons.append('encadeia')
+            if (b, a) in chains:
+                reasons.append('encadeia-reverso')
+            if (a, b) in overlaps:
+                reasons.append('sobrepõe')
+            if reasons:
+                order_dependent.append((a, b, '+'.join(reasons)))
+
+        # Só a saída de uma regra anterior pode afetar uma posterior; o
+        # encadeamento "reverso" não muda o resultado dentro de um grupo
+        groups, current = [], []
+        for index in range(count):
+            all_stable = stable[index] and all(stable[member] for member in current)
+            feeds = chains if all_stable else strict
+            joinable = self.shapes[index].fusable and all(
+                (member, index) not in feeds and (member, index) not in overlaps
+                for member in current)
+            if current and not joinable:
+                groups.append(FusedGroup([self.rules[i] for i in current]))
+                current = []
+            current.append(index)
+            if not self.shapes[index].fusable:
+                groups.append(FusedGroup([self.rules[i] for i in current]))
+                current = []
+        if current:
+            groups.append(FusedGroup([self.rules[i] for i in current]))
+
+        return Analysis(self.rules, chains, overlaps, _cycles(count, chains), order_dependent, groups)
+
+
+def _is_wild(item) -> bool:
+    try:
+        _language([item], Shape())
+        return False
+    except _Infinite:
+        return True
+
+
+def _cycles(count: int, edges: Set[Tuple[int, int]]) -> List[List[int]]:
+    """Componentes fortemente conexas (Tarjan) com mais de uma regra"""
+    graph: Dict[int, List[int]] = {node: [] for node in range(count)}
+    for a, b in edges:
+        graph[a].append(b)
+
+    index_of, low, stack, on_stack = {}, {}, [], set()
+    components, counter = [], [0]
+
+    def visit(root: int):
+        # versão iterativa para não estourar a recursão
+        work = [(root, iter(graph[root]))]
+        index_of[root] = low[root] = counter[0]
+        counter[0] += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index_of:
+                    index_of[child] = low[child] = counter[0]
+                    counter[0] += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph[child])))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index_of[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1:
+                    components.append(sorted(component))
+
+    for node in range(count):
+        if node not in index_of:
+            visit(node)
+    return components
+
+
+def _shift_template(template: str, offset: int) -> str:
+    """Renumera referências (\\1, \\g<1>) para a posição na alternação"""
+    def shift(match):
+        if match.group(3) is not None:
+            return match.group(0)
+        return f'\\g<{int(match.group(1) or match.group(2)) + offset}>'
+    return _TEMPLATE.sub(shift, template)
+
+
+class FusedGroup:
+    """Regras sem conflito entre si aplicadas em uma única varredura"""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = list(rules)
+        self.ids = [rule.id for rule in self.rules]
+        self._templates: Dict[str, Tuple[Rule, Optional[str]]] = {}
+
+        alternatives = []
+        group_number = 1
+        for position, rule in enumerate(self.rules):
+            name = f'r{position}'
+            source = rule.pattern if rule.kind == 'regex' else re.escape(rule.pattern)
+            alternatives.append(f'(?P<{name}>{source})')
+            template = _shift_template(rule.replacement, group_number) if rule.kind == 'regex' else None
+            self._templates[name] = (rule, template)
+            group_number += 1 + rule.regex.groups
+
+        flags = self.rules[0].flags if len(self.rules) == 1 else 0
+        self.regex = re.compile('|'.join(alternatives), flags)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def apply(self, content: str) -> Tuple[str, Dict[str, int]]:
+        """Aplica o grupo e retorna (conteúdo, contagem de matches por regra)"""
+        if len(self.rules) == 1:
+            rule = self.rules[0]
+            new_content, count = rule.apply(content)
+            return new_content, ({rule.id: count} if count else {})
+
+        counts: Dict[str, int] = {}
+
+        def replace(match):
+            rule, template = self._templates[match.lastgroup]
+            counts[rule.id] = counts.get(rule.id, 0) + 1
+            return rule.replacement if template is None else match.expand(template)
+
+        return self.regex.sub(replace, content), counts
+
+
+_REPEATS = tuple(getattr(sre_c, name) for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') if hasattr(sre_c, name))
+_NEWLINE_CATEGORIES = {sre_c.CATEGORY_SPACE, sre_c.CATEGORY_NOT_WORD, sre_c.CATEGORY_NOT_DIGIT, sre_c.CATEGORY_LINEBREAK}
+_LOCAL_ANCHORS = {sre_c.AT_BOUNDARY, sre_c.AT_NON_BOUNDARY}
+
+
+def _class_has_newline(items) -> bool:
+    negate = found = False
+    for op, av in items:
+        if op is sre_c.NEGATE:
+            negate = True
+        elif op is sre_c.LITERAL:
+            found |= av == 10
+        elif op is sre_c.RANGE:
+            found |= av[0] <= 10 <= av[1]
+        elif op is sre_c.CATEGORY:
+            found |= av in _NEWLINE_CATEGORIES
+        else:
+            found = True
+    return found != negate
+
+
+def _crosses_lines(items, flags: int) -> bool:
+    """O padrão pode casar (ou olhar) além de uma quebra de linha?"""
+    for op, av in items:
+        if op is sre_c.LITERAL:
+            if av == 10:
+                return True
+        elif op is sre_c.NOT_LITERAL:
+            if av != 10:
+                return True
+        elif op is sre_c.ANY:
+            if flags & re.DOTALL:
+                return True
+        elif op is sre_c.IN:
+            if _class_has_newline(av):
+                return True
+        elif op in _REPEATS:
+            if _crosses_lines(av[2], flags):
+                return True
+        elif op is sre_c.SUBPATTERN:
+            if _crosses_lines(av[-1], (flags | av[1]) & ~av[2]):
+                return True
+        elif op is sre_c.BRANCH:
+            if any(_crosses_lines(branch, flags) for branch in av[1]):
+                return True
+        elif op in (sre_c.ASSERT, sre_c.ASSERT_NOT):
+            if _crosses_lines(av[1], flags):
+                return True
+        elif op is sre_c.AT:
+            # ^/$ sem MULTILINE, \A e \Z dependem do início/fim do texto inteiro
+            multiline = flags & re.MULTILINE and av in (sre_c.AT_BEGINNING, sre_c.AT_END)
+            if av not in _LOCAL_ANCHORS and not multiline:
+                return True
+        elif op is not sre_c.GROUPREF:
+            return True
+    return False
+
+
+def line_local(rule: Rule) -> bool:
+    """A regra nunca casa através de quebras de linha?
+
+    Se todas as regras de um script são locais à linha, aplicá-las a blocos
+    de linhas completas dá o mesmo resultado que aplicá-las ao arquivo
+    inteiro, o que permite processar arquivos grandes em streaming.
+    Conservadora: construções desconhecidas contam como não locais.
+    """
+    if rule.kind == 'literal':
+        return '\n' not in rule.pattern
+    parsed = sre_parse.parse(rule.pattern, rule.flags)
+    return not _crosses_lines(list(parsed), parsed.state.flags)
+
+
+def compile_rules(rules: List[Rule]) -> Analysis:
+    """Atalho: analisa e agrupa uma lista ordenada de regras"""
+    return RuleCompiler(rules).compile()
+
+
+def apply_sequential(rules: List[Rule], content: str) -> str:
+    """Referência: aplica as regras uma a uma, como os scripts fazem hoje"""
+    for rule in rules:
+        content, _ = rule.apply(content)
+    return content
+
+
+def apply_groups(groups: List[FusedGroup], content: str) -> Tuple[str, Dict[str, int]]:
+    """Aplica os grupos fundidos em ordem, somando as contagens"""
+    counts: Dict[str, int] = {}
+    for group in groups:
+        content, group_counts = group.apply(content)
+        for rule_id, count in group_counts.items():
+            counts[rule_id] = counts.get(rule_id, 0) + count
+    return content, counts
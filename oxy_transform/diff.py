@@ -0,0 +1,266 @@
+"""
+Diff unificado incremental para --dry-run
+
+O diff só é montado para arquivos que mudaram. As substituições quase
+nunca mudam o número de linhas, então basta comparar as listas de linhas
+posição a posição (comparação de strings em C) para achar as linhas
+tocadas pelos matches, sem rodar o LCS do difflib no arquivo inteiro; só
+blocos em que o número de linhas muda passam pelo SequenceMatcher, e
+apenas no trecho entre o prefixo e o sufixo comuns.
+
+O UnifiedDiff recebe o arquivo em pedaços (o arquivo inteiro ou os blocos
+do caminho de streaming) e guarda na memória só as linhas de contexto
+necessárias: o hunk aberto e os já fechados vão para temporários do próprio
+diff, que o DiffWriter copia para a saída sob o lock, então o diff de um
+arquivo do caminho de streaming não fica inteiro na memória. A saída segue o formato
+do `git diff` (a/ e b/ relativos à raiz do repositório), aplicável com
+`git apply`. Linhas são quebradas só em `\n`,
+como no git: `str.splitlines` também quebraria em U+2028, `\x0c`, `\r`
+solto etc. e geraria hunks que não aplicam.
+
+Renomeações (FASE 1) entram no mesmo patch: um arquivo movido e alterado
+vira um diff com `rename from`/`rename to` e os hunks; os só movidos são
+emitidos no fechamento.
+"""
+import difflib
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, TextIO
+
+CONTEXT = 3
+
+
+def _range(start: int, length: int) -> str:
+    """Faixa de um cabeçalho @@, no formato do diff unificado"""
+    if length == 1:
+        return f"{start + 1}"
+    if length == 0:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def _lines(text: str) -> List[str]:
+    """Linhas com o `\n` final, quebrando só em `\n` (como o git)"""
+    lines = text.split('\n')
+    last = lines.pop()
+    lines = [line + '\n' for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+def _spool() -> TextIO:
+    return tempfile.TemporaryFile('w+', encoding='utf-8', newline='')
+
+
+def _line(prefix: str, line: str) -> str:
+    if line.endswith('\n'):
+        return prefix + line
+    return f"{prefix}{line}\n\\ No newline at end of file\n"
+
+
+class UnifiedDiff:
+    """Monta o diff de um arquivo a partir de pares (antigo, novo) em sequência"""
+
+    def __init__(self, path: str, context: int = CONTEXT, new_path: Optional[str] = None):
+        self.path = path
+        self.new_path = new_path or path
+        self.context = context
+        self.old_line = 0
+        self.new_line = 0
+        self.spool: Optional[TextIO] = None   # hunks já fechados
+        self.body: Optional[TextIO] = None    # linhas do hunk aberto
+        self.leading: List[str] = []     # contexto antes do próximo hunk
+        self.in_hunk = False
+        self.hunk_start = (0, 0)
+        self.hunk_counts = [0, 0]
+        self.pending: List[str] = []     # linhas iguais depois do último trecho alterado
+
+    def feed(self, old: str, new: str):
+        """Compara um pedaço do arquivo (linhas completas) com sua versão nova"""
+        if old == new:
+            self.equal(_lines(old))
+            return
+        old_lines = _lines(old)
+        new_lines = _lines(new)
+        if len(old_lines) == len(new_lines):
+            position = 0
+            for index in [i for i, (a, b) in enumerate(zip(old_lines, new_lines)) if a != b]:
+                self.equal(old_lines[position:index])
+                self.change(old_lines[index:index + 1], new_lines[index:index + 1])
+                position = index + 1
+            self.equal(old_lines[position:])
+            return
+
+        # Número de linhas mudou: difflib só no miolo entre prefixo e sufixo comuns
+        prefix = 0
+        limit = min(len(old_lines), len(new_lines))
+        while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix
+               and old_lines[len(old_lines) - 1 - suffix] == new_lines[len(new_lines) - 1 - suffix]):
+            suffix += 1
+        self.equal(old_lines[:prefix])
+        old_middle = old_lines[prefix:len(old_lines) - suffix]
+        new_middle = new_lines[prefix:len(new_lines) - suffix]
+        matcher = difflib.SequenceMatcher(None, old_middle, new_middle, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                self.equal(old_middle[i1:i2])
+            else:
+                self.change(old_middle[i1:i2], new_middle[j1:j2])
+        self.equal(old_lines[len(old_lines) - suffix:])
+
+    def equal(self, lines: List[str]):
+        if not lines:
+            return
+        if not self.in_hunk:
+            self.leading = (self.leading + lines)[-self.context:] if self.context else []
+        else:
+            self.pending.extend(lines)
+            if len(self.pending) > 2 * self.context:
+                # Trecho igual longo: fecha o hunk e guarda o contexto do próximo
+                tail = self.pending[len(self.pending) - self.context:] if self.context else []
+                self.pending = self.pending[:self.context]
+                self._close_hunk(len(lines))
+                self.leading = tail
+                return
+        self.old_line += len(lines)
+        self.new_line += len(lines)
+
+    def change(self, old_lines: List[str], new_lines: List[str]):
+        if not self.in_hunk:
+            if self.body is None:
+                self.body = _spool()
+            self.body.writelines(_line(' ', line) for line in self.leading)
+            self.in_hunk = True
+            self.hunk_start = (self.old_line - len(self.leading), self.new_line - len(self.leading))
+            self.hunk_counts = [len(self.leading), len(self.leading)]
+            self.leading = []
+        else:
+            self.body.writelines(_line(' ', line) for line in self.pending)
+            self.hunk_counts[0] += len(self.pending)
+            self.hunk_counts[1] += len(self.pending)
+            self.pending = []
+        self.body.writelines(_line('-', line) for line in old_lines)
+        self.body.writelines(_line('+', line) for line in new_lines)
+        self.hunk_counts[0] += len(old_lines)
+        self.hunk_counts[1] += len(new_lines)
+        self.old_line += len(old_lines)
+        self.new_line += len(new_lines)
+
+    def _close_hunk(self, advance: int = 0):
+        """Fecha o hunk aberto; `advance` linhas iguais ainda não foram contadas"""
+        self.body.writelines(_line(' ', line) for line in self.pending)
+        self.hunk_counts[0] += len(self.pending)
+        self.hunk_counts[1] += len(self.pending)
+        if self.spool is None:
+            self.spool = _spool()
+            self.spool.write(self.header() + f"--- a/{self.path}\n+++ b/{self.new_path}\n")
+        # O cabeçalho @@ depende das contagens, então o hunk só vai para o
+        # spool quando fecha; o temporário do corpo é reaproveitado
+        old_start, new_start = self.hunk_start
+        self.spool.write(f"@@ -{_range(old_start, self.hunk_counts[0])} "
+                         f"+{_range(new_start, self.hunk_counts[1])} @@\n")
+        self.body.seek(0)
+        shutil.copyfileobj(self.body, self.spool)
+        self.body.seek(0)
+        self.body.truncate()
+        self.in_hunk = False
+        self.pending = []
+        self.old_line += advance
+        self.new_line += advance
+
+    def header(self, similarity: str = '') -> str:
+        header = f"diff --git a/{self.path} b/{self.new_path}\n"
+        if self.new_path != self.path:
+            header += f"{similarity}rename from {self.path}\nrename to {self.new_path}\n"
+        return header
+
+    def finish(self) -> bool:
+        """Fecha o último hunk; False se não há nada a gravar"""
+        if self.in_hunk:
+            self._close_hunk()
+        return self.spool is not None or self.new_path != self.path
+
+    def copy_to(self, stream: TextIO):
+        """Copia o diff completo para `stream` e descarta o temporário"""
+        if self.spool is None:
+            stream.write(self.header('similarity index 100%\n'))
+            return
+        self.spool.seek(0)
+        shutil.copyfileobj(self.spool, stream)
+        self.close()
+
+    def close(self):
+        for spool in (self.spool, self.body):
+            if spool is not None:
+                spool.close()
+        self.spool = self.body = None
+
+
+def repo_root(base_dir: Path) -> Path:
+    """Raiz do repositório git que contém `base_dir` (ou o próprio base_dir)"""
+    base_dir = Path(base_dir).resolve()
+    for directory in [base_dir, *base_dir.parents]:
+        if (directory / '.git').exists():
+            return directory
+    return base_dir
+
+
+class DiffWriter:
+    """Grava diffs de arquivos inteiros, um por vez, no stdout ou num .patch"""
+
+    def __init__(self, target: str, root: Path):
+        self.target = target
+        self.root = Path(root)
+        self.stream: TextIO = sys.stdout if target == '-' else open(target, 'w', encoding='utf-8', newline='')
+        self.lock = threading.Lock()
+        self.files = 0
+        # arquivo de origem → caminho novo (relativo), para renomeações simuladas
+        self.renames: Dict[Path, str] = {}
+        self.written: Set[str] = set()
+
+    def path(self, file_path: Path) -> str:
+        """Caminho do arquivo relativo à raiz do repositório, com /"""
+        try:
+            return Path(file_path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(file_path).as_posix()
+
+    def rename(self, old: Path, new: Path):
+        """Registra a renomeação de um arquivo ou diretório em vez de executá-la"""
+        old, new = Path(old), Path(new)
+        if old.is_dir():
+            for file_path in sorted(path for path in old.rglob('*') if path.is_file()):
+                self.renames[file_path.resolve()] = self.path(new / file_path.relative_to(old))
+        else:
+            self.renames[old.resolve()] = self.path(new)
+
+    def start(self, file_path: Path) -> UnifiedDiff:
+        return UnifiedDiff(self.path(file_path), new_path=self.renames.get(Path(file_path).resolve()))
+
+    def write(self, diff: UnifiedDiff):
+        try:
+            if not diff.finish():
+                return
+            with self.lock:
+                diff.copy_to(self.stream)
+                self.stream.flush()
+                self.files += 1
+                self.written.add(diff.path)
+        finally:
+            diff.close()
+
+    def close(self):
+        # Arquivos só movidos, sem mudança de conteúdo
+        for file_path in self.renames:
+            if self.path(file_path) not in self.written:
+                self.write(self.start(file_path))
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
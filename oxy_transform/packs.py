@@ -0,0 +1,188 @@
+"""
+Pacotes de regras declarativos (TOML/JSON) e bundles compilados em cache
+
+Cada pacote em `rules/` declara conjuntos de regras na ordem de aplicação
+e pode incluir outros pacotes (ex.: `pipeline` inclui `vet-medical`, que
+também é usado sozinho pela FASE 3):
+
+    name = "vet-medical"
+    include = ["outro-pacote"]      # opcional, aplicado antes
+
+    [[sets]]
+    name = "TERMINOLOGY_MAP"
+    kind = "regex"                  # ou "literal"
+    flags = ["IGNORECASE"]          # opcional
+    rules = [
+        ['\\bpet\\b', 'patient'],
+    ]
+
+O bundle é o pacote compilado em grupos fundidos (compiler.py). A análise
+de encadeamentos é a parte cara (~0,3 s para o pipeline inteiro), então o
+agrupamento resultante fica em cache no disco, indexado pelo hash do
+conteúdo resolvido do pacote e do código que faz a análise (compiler.py,
+rules.py e este arquivo); com o cache quente, carregar um bundle só
+lê o TOML e monta as regex dos grupos. Regex compiladas não são
+serializáveis, por isso o cache guarda o agrupamento e não os objetos.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import reduce
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from .compiler import FusedGroup, apply_groups, compile_rules, line_local
+from .rules import REPO_DIR, Rule, _pairs, rule_id
+
+PACKS_DIR = REPO_DIR / 'rules'
+CACHE_DIR = Path(os.environ.get('OXY_RULES_CACHE') or REPO_DIR / '.cache' / 'rules')
+
+# Os grupos só são seguros por causa da análise do compilador: qualquer
+# mudança nele (ou no carregamento das regras) invalida os bundles em cache
+COMPILER_DIGEST = hashlib.sha256(b''.join(
+    Path(__file__).with_name(name).read_bytes() for name in ('compiler.py', 'rules.py', 'packs.py'))).hexdigest()
+
+
+class Pack:
+    """Pacote de regras com os includes já resolvidos, em ordem de aplicação"""
+
+    def __init__(self, name: str, description: str, includes: List[str], rules: List[Rule]):
+        self.name = name
+        self.description = description
+        self.includes = includes
+        self.rules = rules
+        self.digest = _digest(rules)
+
+    def rules_of(self, set_name: str, pack: Optional[str] = None) -> List[Rule]:
+        """Regras de um conjunto (por padrão, do próprio pacote)"""
+        prefix = f"{pack or self.name}:{set_name}["
+        return [rule for rule in self.rules if rule.id.startswith(prefix)]
+
+
+def _digest(rules: List[Rule]) -> str:
+    payload = [[r.id, r.kind, r.pattern, r.replacement, r.flags] for r in rules]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _read(name: str, packs_dir: Path) -> dict:
+    toml_path = packs_dir / f'{name}.toml'
+    json_path = packs_dir / f'{name}.json'
+    if toml_path.exists():
+        if tomllib is None:
+            raise ImportError(f"{toml_path.name}: leitura de TOML requer Python 3.11+ ou `pip install tomli`")
+        with open(toml_path, 'rb') as f:
+            return tomllib.load(f)
+    if json_path.exists():
+        return json.loads(json_path.read_text(encoding='utf-8'))
+    raise FileNotFoundError(f"Pacote de regras não encontrado: {name} (em {packs_dir})")
+
+
+def _flags(names: List[str]) -> int:
+    return reduce(lambda flags, name: flags | getattr(re, name), names, 0)
+
+
+def _resolve(name: str, packs_dir: Path, stack: List[str], seen: Set[str]) -> Tuple[dict, List[Rule]]:
+    if name in stack:
+        raise ValueError(f"Ciclo de include entre pacotes: {' → '.join(stack + [name])}")
+    data = _read(name, packs_dir)
+    if data.get('name', name) != name:
+        raise ValueError(f"{name}: o campo name ({data['name']!r}) difere do nome do arquivo")
+
+    rules = []
+    for included in data.get('include', []):
+        # Um pacote incluído por mais de um caminho entra uma vez só
+        if included not in seen:
+            seen.add(included)
+            rules.extend(_resolve(included, packs_dir, stack + [name], seen)[1])
+
+    for rule_set in data.get('sets', []):
+        kind = rule_set.get('kind', 'regex')
+        if kind not in ('regex', 'literal'):
+            raise ValueError(f"{name}:{rule_set['name']}: kind inválido {kind!r}")
+        flags = _flags(rule_set.get('flags', []))
+        for index, (pattern, replacement) in enumerate(_pairs(rule_set['rules'])):
+            rules.append(Rule(rule_id(name, rule_set['name'], index), pattern, replacement, kind, name, flags))
+    return data, rules
+
+
+def load_pack(name: str, packs_dir: Path = PACKS_DIR) -> Pack:
+    """Lê um pacote e seus includes, na ordem de aplicação"""
+    data, rules = _resolve(name, Path(packs_dir), [], {name})
+    return Pack(name, data.get('description', ''), list(data.get('include', [])), rules)
+
+
+def load_pipeline(packs: Optional[List[str]] = None, packs_dir: Path = PACKS_DIR) -> List[Rule]:
+    """Regras do pipeline completo, ou dos pacotes indicados, em ordem"""
+    rules = []
+    for name in packs or ['pipeline']:
+        rules.extend(load_pack(name, packs_dir).rules)
+    return rules
+
+
+class Bundle:
+    """Pacote compilado: grupos fundidos prontos para aplicar"""
+
+    def __init__(self, pack: Pack, groups: List[List[int]], line_local: bool):
+        self.pack = pack
+        self.rules = pack.rules
+        self.groups = [FusedGroup([pack.rules[index] for index in group]) for group in groups]
+        self.line_local = line_local
+        # Só com regras literais dá para pré-filtrar por substring
+        self.needles = [rule.pattern for rule in self.rules] if all(
+            rule.kind == 'literal' for rule in self.rules) else None
+
+    def apply(self, content: str) -> Tuple[str, Dict[str, int]]:
+        """Aplica todas as regras; retorna (conteúdo, matches por regra)"""
+        return apply_groups(self.groups, content)
+
+
+def _bundle_digest(pack: Pack) -> str:
+    return hashlib.sha256(f"{pack.digest}:{COMPILER_DIGEST}".encode('utf-8')).hexdigest()
+
+
+def _compile(pack: Pack) -> dict:
+    analysis = compile_rules(pack.rules)
+    index = {rule.id: position for position, rule in enumerate(pack.rules)}
+    return {
+        'digest': _bundle_digest(pack),
+        'groups': [[index[rule_id] for rule_id in group.ids] for group in analysis.groups],
+        'line_local': all(line_local(rule) for rule in pack.rules),
+    }
+
+
+def load_bundle(name: str, packs_dir: Path = PACKS_DIR, cache_dir: Optional[Path] = CACHE_DIR) -> Bundle:
+    """Carrega um bundle, compilando só se o cache não tiver este conteúdo"""
+    pack = load_pack(name, packs_dir)
+    digest = _bundle_digest(pack)
+    cache_file = Path(cache_dir) / f"{name}-{digest[:16]}.json" if cache_dir else None
+
+    compiled = None
+    if cache_file:
+        try:
+            compiled = json.loads(cache_file.read_text(encoding='utf-8'))
+            if compiled.get('digest') != digest:
+                compiled = None
+        except (OSError, ValueError):
+            compiled = None
+
+    if compiled is None:
+        compiled = _compile(pack)
+        if cache_file:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                temp = cache_file.with_name(cache_file.name + '.tmp')
+                temp.write_text(json.dumps(compiled), encoding='utf-8')
+                os.replace(temp, cache_file)
+            except OSError:
+                pass  # sem cache gravável, só recompila na próxima vez
+
+    return Bundle(pack, compiled['groups'], compiled['line_local'])
@@ -0,0 +1,220 @@
+"""
+Progresso ao vivo e métricas de execuções longas
+
+O Progress acompanha arquivos/s, MB/s, fila (quando há paralelismo), ETA e
+os arquivos mais lentos. A linha no terminal e o arquivo de métricas são
+atualizados no máximo a cada `interval` segundos; o endpoint HTTP monta o
+texto Prometheus sob demanda. Sem nenhuma das opções o Runner não cria o
+Progress e o custo é zero.
+"""
+import heapq
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Optional, TextIO, Tuple
+
+from .report import FileResult
+
+PREFIX = 'oxy_transform'
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def _label(value: str) -> str:
+    """Escapa um valor de label no formato texto do Prometheus"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Progress:
+    """Contadores de vazão, ETA e arquivos mais lentos de uma execução"""
+
+    def __init__(self, job: str, display: bool = True, stream: TextIO = sys.stderr,
+                 interval: float = 0.5, slowest: int = 5,
+                 metrics_file: Optional[str] = None, metrics_port: Optional[int] = None):
+        self.job = job
+        self.display = display
+        self.stream = stream
+        self.interval = interval
+        self.slowest_count = slowest
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.queue: Optional[Callable[[], int]] = None
+
+        self.started = time.monotonic()
+        self.last_tick = 0.0
+        self.expected = 0
+        self.files = 0
+        self.changed = 0
+        self.changes = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.rules: Counter = Counter()
+        self.slowest: List[Tuple[float, str]] = []
+        self.lock = threading.Lock()
+        self.tty = display and stream.isatty()
+
+        self.server = None
+        if metrics_port is not None:
+            self.serve(metrics_port)
+
+    def expect(self, count: int):
+        """Soma `count` arquivos ao total esperado (uma chamada por leva)"""
+        with self.lock:
+            self.expected += count
+
+    def update(self, result: FileResult):
+        with self.lock:
+            self.files += 1
+            self.changed += result.changed
+            self.changes += result.changes
+            self.errors += result.error is not None
+            self.bytes_in += result.bytes_in
+            self.bytes_out += result.bytes_out
+            self.rules.update(result.rules)
+            entry = (result.seconds, result.path)
+            if len(self.slowest) < self.slowest_count:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+        now = time.monotonic()
+        if now - self.last_tick >= self.interval:
+            self.last_tick = now
+            self.tick()
+
+    def tick(self):
+        if self.display:
+            self.render()
+        if self.metrics_file:
+            self.write_metrics()
+
+    # ---- cálculo ----
+
+    def rates(self) -> Tuple[float, float, float, Optional[float]]:
+        """(decorrido, arquivos/s, MB/s, ETA em segundos ou None)"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        files_per_second = self.files / elapsed
+        mb_per_second = self.bytes_in / elapsed / 1_000_000
+        eta = None
+        if self.expected and files_per_second:
+            eta = max(self.expected - self.files, 0) / files_per_second
+        return elapsed, files_per_second, mb_per_second, eta
+
+    def status(self) -> str:
+        elapsed, files_per_second, mb_per_second, eta = self.rates()
+        if self.expected:
+            parts = [f"⏳ {self.files}/{self.expected} ({self.files / self.expected:.0%})"]
+        else:
+            parts = [f"⏳ {self.files} arquivos"]
+        parts.append(f"{files_per_second:.1f} arq/s")
+        parts.append(f"{mb_per_second:.2f} MB/s")
+        if self.queue is not None:
+            parts.append(f"fila {self.queue()}")
+        parts.append(f"ETA {_duration(eta)}" if eta is not None else f"{_duration(elapsed)} decorridos")
+        return ' · '.join(parts)
+
+    def render(self):
+        line = self.status()
+        if self.tty:
+            self.stream.write(f"\r\033[K{line}")
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+    # ---- métricas ----
+
+    def metrics(self) -> str:
+        """Contadores atuais no formato texto do Prometheus"""
+        with self.lock:
+            elapsed, _, _, eta = self.rates()
+            job = f'job="{_label(self.job)}"'
+            samples = [
+                ('files_total', 'counter', 'Arquivos processados', self.files),
+                ('files_changed_total', 'counter', 'Arquivos modificados', self.changed),
+                ('changes_total', 'counter', 'Mudanças aplicadas', self.changes),
+                ('errors_total', 'counter', 'Arquivos com erro', self.errors),
+                ('bytes_read_total', 'counter', 'Bytes lidos', self.bytes_in),
+                ('bytes_written_total', 'counter', 'Bytes resultantes', self.bytes_out),
+                ('files_expected', 'gauge', 'Arquivos esperados nesta execução', self.expected),
+                ('elapsed_seconds', 'gauge', 'Tempo desde o início', round(elapsed, 3)),
+            ]
+            if eta is not None:
+                samples.append(('eta_seconds', 'gauge', 'Estimativa para o fim', round(eta, 3)))
+            if self.queue is not None:
+                samples.append(('queue_depth', 'gauge', 'Arquivos aguardando processamento', self.queue()))
+
+            lines = []
+            for name, kind, help_text, value in samples:
+                lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+                lines.append(f"{PREFIX}_{name}{{{job}}} {value}")
+
+            lines.append(f"# HELP {PREFIX}_rule_matches_total Matches por regra")
+            lines.append(f"# TYPE {PREFIX}_rule_matches_total counter")
+            for rule, count in sorted(self.rules.items()):
+                lines.append(f'{PREFIX}_rule_matches_total{{{job},rule="{_label(rule)}"}} {count}')
+
+            lines.append(f"# HELP {PREFIX}_slowest_file_seconds Arquivos mais lentos até agora")
+            lines.append(f"# TYPE {PREFIX}_slowest_file_seconds gauge")
+            for seconds, path in sorted(self.slowest, reverse=True):
+                lines.append(f'{PREFIX}_slowest_file_seconds{{{job},path="{_label(path)}"}} {seconds:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def write_metrics(self):
+        """Grava o arquivo de métricas de forma atômica (textfile collector)"""
+        temp = self.metrics_file.with_name(self.metrics_file.name + '.tmp')
+        temp.write_text(self.metrics(), encoding='utf-8')
+        os.replace(temp, self.metrics_file)
+
+    def serve(self, port: int):
+        """Expõe /metrics em 127.0.0.1:`port` numa thread daemon"""
+        # Importado só aqui: http.server pesa na partida de execuções curtas
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        progress = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = progress.metrics().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        if self.display:
+            print(f"📈 Métricas em http://127.0.0.1:{self.server.server_port}/metrics", file=self.stream)
+
+    # ---- fim ----
+
+    def close(self):
+        if self.display:
+            self.render()
+            if self.tty:
+                self.stream.write('\n')
+            if self.slowest:
+                self.stream.write("🐢 Arquivos mais lentos:\n")
+                for seconds, path in sorted(self.slowest, reverse=True):
+                    self.stream.write(f"   {seconds * 1000:>9.1f} ms  {path}\n")
+            self.stream.flush()
+        if self.metrics_file:
+            self.write_metrics()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
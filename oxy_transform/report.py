@@ -0,0 +1,138 @@
+"""
+Relatório de execução em JSONL
+
+Cada arquivo processado vira uma linha JSON gravada assim que o arquivo
+termina (path, regras aplicadas, contagens, bytes e tempo). Nada fica
+acumulado em memória além dos totais do Summary, cujo tamanho é limitado
+pelo número de regras, não de arquivos.
+"""
+import json
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, TextIO
+
+
+@dataclass
+class FileResult:
+    """Resultado de um arquivo processado"""
+    path: str
+    changed: bool = False
+    changes: int = 0
+    rules: Dict[str, int] = field(default_factory=dict)
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    cached: bool = False
+
+    def record(self) -> dict:
+        """Linha compacta do JSONL"""
+        record = {
+            'path': self.path,
+            'changed': self.changed,
+            'changes': self.changes,
+            'rules': self.rules,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ms': round(self.seconds * 1000, 3),
+        }
+        if self.error:
+            record['error'] = self.error
+        if self.cached:
+            record['cached'] = True
+        return record
+
+
+class Summary:
+    """Totais agregados de uma execução (ou de um JSONL já gravado)"""
+
+    def __init__(self):
+        self.files = 0
+        self.changed = 0
+        self.changes = 0
+        self.errors = 0
+        self.cached = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        self.rules: Counter = Counter()
+
+    def add(self, result: FileResult):
+        self.add_record(result.record())
+
+    def add_record(self, record: dict):
+        self.files += 1
+        self.changed += bool(record.get('changed'))
+        self.changes += record.get('changes', 0)
+        self.errors += 'error' in record
+        self.cached += bool(record.get('cached'))
+        self.bytes_in += record.get('bytes_in', 0)
+        self.bytes_out += record.get('bytes_out', 0)
+        self.seconds += record.get('ms', 0) / 1000
+        self.rules.update(record.get('rules', {}))
+
+    def as_dict(self) -> dict:
+        return {
+            'files': self.files,
+            'changed': self.changed,
+            'changes': self.changes,
+            'errors': self.errors,
+            'cached': self.cached,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'seconds': round(self.seconds, 3),
+            'rules': dict(self.rules.most_common()),
+        }
+
+    def lines(self, top: int = 10) -> List[str]:
+        """Resumo compacto para o terminal"""
+        lines = [
+            f"   Arquivos processados: {self.files}",
+            f"   Arquivos modificados: {self.changed}",
+            f"   Total de mudanças: {self.changes}",
+            f"   Bytes: {self.bytes_in} → {self.bytes_out}",
+            f"   Tempo em transformação: {self.seconds:.2f}s",
+        ]
+        if self.errors:
+            lines.append(f"   Erros: {self.errors}")
+        if self.cached:
+            lines.append(f"   Vindos do cache: {self.cached}")
+        if self.rules:
+            lines.append(f"   Regras mais aplicadas:")
+            for rule_id, count in self.rules.most_common(top):
+                lines.append(f"      {count:>6}  {rule_id}")
+        return lines
+
+
+class JsonlReporter:
+    """Grava um registro por arquivo, imediatamente, em um JSONL"""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.stream: TextIO = sys.stdout if target == '-' else open(target, 'w', encoding='utf-8')
+
+    def write(self, result: FileResult):
+        self.stream.write(json.dumps(result.record(), ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def close(self, summary: Optional[Summary] = None):
+        if summary is not None:
+            self.stream.write(json.dumps({'summary': summary.as_dict()}, ensure_ascii=False) + '\n')
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+def read_summary(streams: Iterable[TextIO]) -> Summary:
+    """Agrega registros de um ou mais JSONL, linha a linha"""
+    summary = Summary()
+    for stream in streams:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'path' in record:
+                summary.add_record(record)
+    return summary
@@ -0,0 +1,51 @@
+"""
+Regra de substituição comum a todos os scripts de transformação
+
+As regras em si ficam nos pacotes declarativos de `rules/` (ver packs.py);
+aqui ficam a representação normalizada (Rule) e seus identificadores.
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Rule:
+    """Uma substituição: regex (re.sub) ou literal (str.replace)"""
+    id: str
+    pattern: str
+    replacement: str
+    kind: str = 'regex'
+    source: str = ''
+    flags: int = 0
+    _regex: Optional['re.Pattern'] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def regex(self) -> 're.Pattern':
+        """Padrão compilado (literais são escapados)"""
+        if self._regex is None:
+            source = self.pattern if self.kind == 'regex' else re.escape(self.pattern)
+            self._regex = re.compile(source, self.flags)
+        return self._regex
+
+    def apply(self, content: str) -> Tuple[str, int]:
+        """Aplica a regra isoladamente, como o script original faria"""
+        if self.kind == 'literal':
+            count = content.count(self.pattern)
+            return (content.replace(self.pattern, self.replacement), count) if count else (content, 0)
+        return self.regex.subn(self.replacement, content)
+
+
+def rule_id(pack: str, set_name: str, index: int) -> str:
+    """Identificador estável de uma regra: `<pacote>:<conjunto>[<índice>]`"""
+    return f"{pack}:{set_name}[{index}]"
+
+
+def _pairs(value) -> List[Tuple[str, str]]:
+    """Normaliza dict ou lista de tuplas em lista de pares"""
+    if isinstance(value, dict):
+        return list(value.items())
+    return [tuple(item) for item in value]
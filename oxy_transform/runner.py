@@ -0,0 +1,350 @@
+"""
+Laço comum dos scripts de transformação
+
+Percorre os arquivos, aplica a transformação do script, grava o resultado e
+alimenta o relatório. Cada script fornece só a função de transformação:
+
+    transform(file_path, content) -> (novo_conteúdo, mudanças, {regra: matches})
+
+Com --jobs os arquivos são processados por um pool de threads; com
+--memory-budget o custo dos arquivos em voo é limitado (ver memory.py) e
+arquivos grandes de scripts com regras locais à linha vão para o streaming.
+Com --dry-run nada é gravado: o diff unificado de cada arquivo alterado vai
+para o stdout ou para o arquivo de --patch (ver diff.py). Com --cache o
+resultado de um conteúdo já visto sai do cache em vez de ser recalculado
+(ver cache.py).
+"""
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .cache import ResultCache, file_digest, open_cache, source_digest
+from .diff import DiffWriter, repo_root
+from .memory import MemoryBudget, memory_lines, parse_size, start_tracing
+from .progress import Progress
+from .report import FileResult, JsonlReporter, Summary
+
+Transform = Callable[[Path, str], Tuple[str, int, Dict[str, int]]]
+Label = Callable[[FileResult], str]
+
+
+def walk(base_dir: Path, ignore_dirs: Set[str], should_process: Callable[[Path], bool]) -> Iterator[Path]:
+    """Arquivos de `base_dir` aceitos por `should_process`, podando IGNORE_DIRS"""
+    for root, dirs, files in os.walk(base_dir):
+        dirs[:] = [d for d in dirs if d not in ignore_dirs]
+        for file in files:
+            file_path = Path(root) / file
+            if should_process(file_path):
+                yield file_path
+
+
+def add_runner_args(parser: argparse.ArgumentParser):
+    """Opções comuns a todos os scripts"""
+    group = parser.add_argument_group('execução')
+    group.add_argument('--report', metavar='ARQUIVO',
+                       help="Grava um registro JSONL por arquivo processado ('-' = stdout)")
+    group.add_argument('--quiet', '-q', action='store_true',
+                       help='Não imprime uma linha por arquivo, só o resumo')
+    group.add_argument('--progress', action='store_true',
+                       help='Mostra arquivos/s, MB/s, ETA e os arquivos mais lentos no stderr')
+    group.add_argument('--metrics-file', metavar='ARQUIVO',
+                       help='Grava métricas no formato texto do Prometheus (textfile collector)')
+    group.add_argument('--metrics-port', type=int, metavar='PORTA',
+                       help='Expõe as métricas em http://127.0.0.1:PORTA/metrics durante a execução')
+    group.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                       help='Processa N arquivos em paralelo (padrão: 1)')
+    group.add_argument('--memory-budget', type=parse_size, metavar='TAMANHO',
+                       help='Limita a memória dos arquivos em voo (ex.: 512M, 1G); '
+                            'arquivos grandes são processados em streaming')
+    group.add_argument('--dry-run', action='store_true',
+                       help='Não grava nada; emite o diff unificado das mudanças no stdout')
+    group.add_argument('--patch', metavar='ARQUIVO',
+                       help='Grava o diff em ARQUIVO, aplicável com `git apply` (implica --dry-run)')
+    group.add_argument('--cache', metavar='CAMINHO', default=os.environ.get('OXY_RESULT_CACHE'),
+                       help='Cache de resultados por conteúdo: diretório ou arquivo .sqlite '
+                            '(padrão: $OXY_RESULT_CACHE)')
+    group.add_argument('--cache-max-size', type=parse_size, default='1G', metavar='TAMANHO',
+                       help='Tamanho máximo do cache; remove as entradas menos usadas (padrão: 1G)')
+
+
+class Runner:
+    """Processa arquivos com uma transformação e reporta cada resultado"""
+
+    def __init__(self, base_dir: Path, transform: Optional[Transform], reporter: Optional[JsonlReporter] = None,
+                 quiet: bool = False, label: Optional[Label] = None, progress: Optional[Progress] = None,
+                 jobs: int = 1, budget: Optional[MemoryBudget] = None,
+                 line_local: Optional[Callable[[Path], bool]] = None, diff: Optional[DiffWriter] = None,
+                 cache: Optional[ResultCache] = None, cache_key: Optional[Callable[[Path], Optional[str]]] = None):
+        self.base_dir = Path(base_dir)
+        self.transform = transform
+        self.reporter = reporter
+        self.quiet = quiet
+        self.progress = progress
+        self.jobs = max(jobs, 1)
+        self.budget = budget
+        # Diz se as regras aplicadas a um arquivo são locais à linha (streaming seguro)
+        self.line_local = line_local
+        # Dry-run: com um DiffWriter os arquivos nunca são gravados
+        self.diff = diff
+        # Com o relatório ou o diff no stdout, todo o resto (rótulos, erros,
+        # resumos, inclusive os prints dos scripts) vai para o stderr
+        self.out = sys.stderr if any(writer and writer.stream is sys.stdout
+                                     for writer in (reporter, diff)) else sys.stdout
+        # cache_key: digest das regras que a transformação aplica ao arquivo
+        # (None = não cachear); sem ele o Runner não sabe o que invalida o cache
+        self.cache = cache
+        self.cache_key = cache_key
+        self.label = label or (lambda result: f"✅ {result.path}")
+        self.summary = Summary()
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace, base_dir: Path, transform: Transform,
+                  label: Optional[Label] = None,
+                  line_local: Optional[Callable[[Path], bool]] = None,
+                  cache_key: Optional[Callable[[Path], Optional[str]]] = None) -> 'Runner':
+        diff = None
+        if args.dry_run or args.patch:
+            if args.report == '-' and not args.patch:
+                raise SystemExit('❌ --dry-run sem --patch já usa o stdout; grave o --report num arquivo')
+            diff = DiffWriter(args.patch or '-', repo_root(base_dir))
+        reporter = JsonlReporter(args.report) if args.report else None
+        # Com o relatório ou o diff no stdout, as linhas por arquivo atrapalhariam
+        quiet = args.quiet or args.report == '-' or (diff is not None and diff.stream is sys.stdout)
+        progress = None
+        if args.progress or args.metrics_file or args.metrics_port is not None:
+            progress = Progress(Path(sys.argv[0]).stem, display=args.progress,
+                                metrics_file=args.metrics_file, metrics_port=args.metrics_port)
+        budget = None
+        if args.memory_budget:
+            budget = MemoryBudget(args.memory_budget, args.jobs)
+            start_tracing()
+        cache = None
+        if args.cache and cache_key:
+            # O código (script e oxy_transform/) entra na chave: mudá-lo invalida as entradas
+            cache = open_cache(args.cache, args.cache_max_size, file_digest(sys.argv[0]) + source_digest())
+        return cls(base_dir, transform, reporter, quiet, label, progress, args.jobs, budget, line_local, diff,
+                   cache, cache_key)
+
+    def relative(self, file_path: Path) -> str:
+        try:
+            return str(Path(file_path).relative_to(self.base_dir))
+        except ValueError:
+            return str(file_path)
+
+    def process(self, file_path: Path, transform: Optional[Transform] = None,
+                streaming: bool = False) -> FileResult:
+        """Lê, transforma e grava um arquivo (ou emite o diff, no dry-run)"""
+        result = FileResult(self.relative(file_path))
+        start = time.perf_counter()
+        try:
+            if streaming:
+                self.process_streaming(Path(file_path), transform or self.transform, result)
+                result.seconds = time.perf_counter() - start
+                return result
+
+            # newline='': \r\n e \r chegam às regras como estão no disco e são
+            # gravados de volta sem tradução, igual no dry-run e no real
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                result.bytes_in = result.bytes_out = os.fstat(f.fileno()).st_size
+                content = f.read()
+
+            transform = transform or self.transform
+            key = self.entry_key(Path(file_path), transform, content)
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                new_content, result.changes, result.rules = cached
+                new_content = content if new_content is None else new_content
+                result.cached = True
+            else:
+                new_content, result.changes, result.rules = transform(Path(file_path), content)
+                if key:
+                    self.cache.put(key, content, new_content, result.changes, result.rules)
+
+            if new_content != content:
+                if self.diff:
+                    diff = self.diff.start(file_path)
+                    diff.feed(content, new_content)
+                    self.diff.write(diff)
+                else:
+                    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                        f.write(new_content)
+                result.changed = True
+                result.bytes_out = len(new_content.encode('utf-8'))
+        except Exception as e:
+            result.error = str(e)
+            print(f"❌ Erro em {file_path}: {e}", file=self.out)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def entry_key(self, file_path: Path, transform: Transform, content: str) -> Optional[str]:
+        """Chave do conteúdo no cache (None sem cache ou sem cache_key)"""
+        if not self.cache:
+            return None
+        rules = self.cache_key(file_path)
+        if rules is None:
+            return None
+        return self.cache.key(f"{transform.__qualname__}:{rules}", content)
+
+    def process_streaming(self, file_path: Path, transform: Transform, result: FileResult):
+        """Transforma em blocos de linhas completas, gravando num temporário
+
+        No dry-run não há temporário: cada bloco alimenta o diff do arquivo.
+        """
+        temp = file_path.with_name(f".{file_path.name}.oxy-tmp")
+        diff = self.diff.start(file_path) if self.diff else None
+        rules = Counter()
+        changed = False
+        try:
+            with open(file_path, 'r', encoding='utf-8', newline='') as source, \
+                    open(os.devnull if diff else temp, 'w', encoding='utf-8', newline='') as target:
+                result.bytes_in = os.fstat(source.fileno()).st_size
+                while True:
+                    lines = source.readlines(self.budget.chunk)
+                    if not lines:
+                        break
+                    # Com newline='' um \r solto também encerra a linha; o bloco
+                    # vai até o próximo \n para o diff (que só quebra em \n)
+                    # receber linhas completas
+                    while not lines[-1].endswith('\n'):
+                        line = source.readline()
+                        if not line:
+                            break
+                        lines.append(line)
+                    chunk = ''.join(lines)
+                    new_chunk, changes, hits = transform(file_path, chunk)
+                    result.changes += changes
+                    rules.update(hits)
+                    if new_chunk != chunk:
+                        changed = True
+                    if diff:
+                        diff.feed(chunk, new_chunk)
+                    else:
+                        target.write(new_chunk)
+                    result.bytes_out += len(new_chunk.encode('utf-8'))
+
+            if changed and diff:
+                self.diff.write(diff)
+                result.changed = True
+            elif changed:
+                shutil.copymode(file_path, temp)
+                os.replace(temp, file_path)
+                result.changed = True
+            else:
+                result.bytes_out = result.bytes_in
+        finally:
+            if temp.exists():
+                temp.unlink()
+        result.rules = dict(rules)
+
+    def reserve(self, file_path: Path) -> Tuple[bool, int]:
+        """Escolhe o caminho do arquivo e reserva seu custo (bloqueia sem orçamento)"""
+        if not self.budget:
+            return False, 0
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            return False, 0  # o erro é reportado por process()
+        streaming = (self.budget.oversized(size) and self.line_local is not None
+                     and self.line_local(Path(file_path)))
+        return streaming, self.budget.acquire(self.budget.charge(size, streaming))
+
+    def process_reserved(self, file_path: Path, transform: Optional[Transform],
+                         streaming: bool, charge: int) -> FileResult:
+        try:
+            return self.process(file_path, transform, streaming)
+        finally:
+            if self.budget:
+                self.budget.release(charge, streaming)
+
+    def record(self, result: FileResult, label: Optional[Label] = None):
+        """Contabiliza e reporta um resultado assim que ele fica pronto"""
+        self.summary.add(result)
+        if self.reporter:
+            self.reporter.write(result)
+        if self.progress:
+            self.progress.update(result)
+        if result.changed and not self.quiet:
+            print((label or self.label)(result), file=self.out)
+
+    def run(self, paths: Iterable[Path], label: Optional[Label] = None,
+            transform: Optional[Transform] = None) -> Summary:
+        """Processa uma leva de arquivos; retorna os totais desta leva
+
+        `label` e `transform` substituem os do Runner só nesta leva (scripts
+        com mais de uma etapa compartilham o mesmo relatório).
+        """
+        if self.progress:
+            # Listar antes permite calcular o ETA
+            paths = list(paths)
+            self.progress.expect(len(paths))
+        batch = Summary()
+
+        def finish(result: FileResult):
+            batch.add(result)
+            self.record(result, label)
+
+        if self.jobs > 1:
+            self.run_parallel(paths, transform, finish)
+        else:
+            for file_path in paths:
+                finish(self.process_reserved(file_path, transform, *self.reserve(file_path)))
+        return batch
+
+    def run_parallel(self, paths: Iterable[Path], transform: Optional[Transform],
+                     finish: Callable[[FileResult], None]):
+        """Pool de threads; resultados são registrados nesta thread, na ordem em que terminam"""
+        pending = set()
+        # Enviados ao pool e ainda não iniciados: `pending` inclui os que já rodam
+        waiting = 0
+        lock = threading.Lock()
+
+        def work(file_path: Path, streaming: bool, charge: int) -> FileResult:
+            nonlocal waiting
+            with lock:
+                waiting -= 1
+            return self.process_reserved(file_path, transform, streaming, charge)
+
+        def collect():
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                finish(future.result())
+
+        if self.progress:
+            self.progress.queue = lambda: waiting
+        with ThreadPoolExecutor(self.jobs) as pool:
+            for file_path in paths:
+                # Contrapressão: no máximo dois arquivos por worker na fila, e
+                # reserve() bloqueia enquanto o orçamento de memória estiver cheio
+                while len(pending) >= self.jobs * 2:
+                    collect()
+                streaming, charge = self.reserve(file_path)
+                with lock:
+                    waiting += 1
+                pending.add(pool.submit(work, file_path, streaming, charge))
+            while pending:
+                collect()
+
+    def close(self):
+        if self.progress:
+            self.progress.close()
+        if self.budget:
+            for line in memory_lines(self.budget):
+                print(line, file=self.out)
+        if self.cache:
+            self.cache.close()
+            for line in self.cache.lines():
+                print(line, file=self.out)
+        if self.diff:
+            self.diff.close()
+            print(f"📝 Dry-run: nada foi gravado; diff de {self.diff.files} arquivo(s)"
+                  + (f" em {self.diff.target}" if self.diff.target != '-' else ''), file=self.out)
+        if self.reporter:
+            self.reporter.close(self.summary)
@@ -0,0 +1,598 @@
+"""
+Modo estruturado para JSON e YAML
+
+Em vez de `str.replace` cego no arquivo inteiro, percorre os tokens (sem
+montar a árvore), aplica as regras apenas em chaves/valores dos caminhos
+selecionados e reescreve só esses tokens: formatação, indentação, ordem e
+escapes do resto do arquivo ficam intactos. Subárvores excluídas (ex.: os
+blobs `integrity` do package-lock.json) são puladas sem decodificar nada.
+
+Caminhos são sequências de chaves/índices separadas por ponto, com curingas
+fnmatch por segmento e `**` para qualquer profundidade:
+    'scripts.*', 'services.*.image', '**.integrity'
+"""
+import json
+import re
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+Transform = Callable[[str], Tuple[str, int]]
+Path_ = Tuple[str, ...]
+
+SUFFIXES = {'.json', '.yml', '.yaml'}
+
+
+def _occurrences(text: str, needles: Optional[Iterable[str]]) -> Optional[List[int]]:
+    """Posições onde alguma regra pode casar (None = desconhecido)"""
+    if needles is None:
+        return None
+    needles = [needle for needle in needles if needle]
+    if not needles:
+        return []
+    regex = re.compile('|'.join(re.escape(needle) for needle in needles))
+    return [match.start() for match in regex.finditer(text)]
+
+
+def _split(pattern: str) -> Tuple[str, ...]:
+    return tuple(pattern.split('.')) if pattern else ()
+
+
+def _matches(pattern: Tuple[str, ...], path: Path_) -> bool:
+    """Casa um caminho completo contra um padrão com `**`"""
+    if not pattern:
+        return not path
+    head, rest = pattern[0], pattern[1:]
+    if head == '**':
+        return any(_matches(rest, path[skip:]) for skip in range(len(path) + 1))
+    return bool(path) and fnmatchcase(path[0], head) and _matches(rest, path[1:])
+
+
+def _prefix_of(pattern: Tuple[str, ...], path: Path_) -> bool:
+    """Algum descendente de `path` (ou ele mesmo) pode casar com o padrão?"""
+    if not path:
+        return True
+    if not pattern:
+        return False
+    head, rest = pattern[0], pattern[1:]
+    if head == '**':
+        return True
+    return fnmatchcase(path[0], head) and _prefix_of(rest, path[1:])
+
+
+class PathSelector:
+    """Define quais chaves/valores recebem as regras"""
+
+    def __init__(self, include: Iterable[str] = ('**',), exclude: Iterable[str] = (),
+                 keys: bool = True, comments: bool = False):
+        self.include = [_split(pattern) for pattern in include]
+        self.exclude = [_split(pattern) for pattern in exclude]
+        self.keys = keys
+        self.comments = comments
+
+        self._everything = self.include == [('**',)]
+
+    def selects(self, path: Path_) -> bool:
+        if not self._everything and not any(_matches(p, path) for p in self.include):
+            return False
+        return not self.excludes(path)
+
+    def excludes(self, path: Path_) -> bool:
+        """
+        `path` casa com uma exclusão? Os percursos não descem em subárvores
+        excluídas, então os ancestrais não precisam ser conferidos de novo.
+        """
+        return any(_matches(p, path) for p in self.exclude)
+
+    def reaches(self, path: Path_) -> bool:
+        """Vale a pena descer em `path` (algo abaixo pode ser selecionado)?"""
+        if self.excludes(path):
+            return False
+        return self._everything or any(_prefix_of(p, path) for p in self.include)
+
+
+# --------------------------------------------------------------------------
+# JSON
+# --------------------------------------------------------------------------
+
+_WS = re.compile(r'[ \t\r\n]*')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(r'[^\s,\]}:]+')
+_LITERAL = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null')
+_SKIP = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.DOTALL)
+
+
+def _scalar_end(text: str, pos: int) -> int:
+    """Fim de um número/true/false/null; ValueError para qualquer outra coisa"""
+    match = _SCALAR.match(text, pos)
+    if not match or not _LITERAL.fullmatch(match.group()):
+        raise ValueError(f'JSON inválido na posição {pos}')
+    return match.end()
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """Pula um valor JSON inteiro sem decodificá-lo (só confere o balanceamento)"""
+    char = text[pos]
+    if char == '"':
+        match = _STRING.match(text, pos)
+        if not match:
+            raise ValueError(f'JSON inválido na posição {pos}')
+        return match.end()
+    if char not in '[{':
+        return _scalar_end(text, pos)
+    depth = 0
+    for match in _SKIP.finditer(text, pos):
+        token = match.group()
+        if token in '[{':
+            depth += 1
+        elif token in ']}':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError('JSON inválido: container não fechado')
+
+
+def _rewrite_json_string(token: str, transform: Transform) -> Tuple[str, int]:
+    """Aplica as regras no conteúdo cru do token, preservando escapes"""
+    raw = token[1:-1]
+    new_raw, count = transform(raw)
+    if not count or new_raw == raw:
+        return token, 0
+    try:
+        json.loads('"' + new_raw + '"')
+        return '"' + new_raw + '"', count
+    except ValueError:
+        # A substituição quebrou um escape: reescreve só este token
+        value, count = transform(json.loads(token))
+        return json.dumps(value, ensure_ascii=False), count
+
+
+# Estados de um frame: o que o próximo token pode ser
+_KEY_OR_END, _KEY, _COLON, _VALUE_OR_END, _VALUE, _NEXT = range(6)
+
+
+def transform_json(text: str, transform: Transform, selector: PathSelector,
+                   needles: Optional[Iterable[str]] = None) -> Tuple[str, int]:
+    """
+    Reescreve apenas as strings selecionadas de um documento JSON.
+    `needles` (literais que toda regra exige) permite pular sem descer
+    nos valores assim que não houver mais nenhuma ocorrência adiante; o
+    resto do documento ainda é conferido (sequência de `,`/`:` e nada
+    além de espaços depois do valor raiz), para que um arquivo inválido
+    caia no modo texto.
+    """
+    occurrences = _occurrences(text, needles)
+    if occurrences == [] or not text.strip():
+        return text, 0
+    out: List[str] = []
+    last = 0
+    changes = 0
+    # Cada frame: [tipo, caminho, chave atual ou índice, estado]
+    stack: List[list] = []
+    done = False  # valor raiz completo
+    pos = _WS.match(text, 0).end()
+
+    def invalid() -> ValueError:
+        return ValueError(f'JSON inválido na posição {pos}')
+
+    def value_path() -> Path_:
+        if not stack:
+            return ()
+        kind, path, slot, _ = stack[-1]
+        return path + (slot if kind == 'obj' else str(slot),)
+
+    def value_done():
+        nonlocal done
+        if stack:
+            stack[-1][3] = _NEXT
+        else:
+            done = True
+
+    while pos < len(text):
+        char = text[pos]
+        frame = stack[-1] if stack else None
+        state = frame[3] if frame else None
+
+        if done:
+            raise invalid()  # conteúdo depois do valor raiz
+        elif char == ',':
+            if state != _NEXT:
+                raise invalid()
+            if frame[0] == 'obj':
+                frame[3] = _KEY
+            else:
+                frame[2] += 1
+                frame[3] = _VALUE
+            pos += 1
+        elif char == ':':
+            if state != _COLON:
+                raise invalid()
+            frame[3] = _VALUE
+            pos += 1
+        elif char in '}]':
+            expected = ('obj', (_KEY_OR_END, _NEXT)) if char == '}' else ('arr', (_VALUE_OR_END, _NEXT))
+            if not frame or frame[0] != expected[0] or state not in expected[1]:
+                raise invalid()
+            stack.pop()
+            value_done()
+            pos += 1
+        elif state in (_KEY_OR_END, _KEY):
+            # Chave de objeto
+            match = _STRING.match(text, pos)
+            if not match:
+                raise invalid()
+            token = match.group()
+            frame[2] = json.loads(token)
+            frame[3] = _COLON
+            key_path = frame[1] + (frame[2],)
+            if selector.keys and selector.selects(key_path):
+                new_token, count = _rewrite_json_string(token, transform)
+                if count:
+                    out.append(text[last:pos])
+                    out.append(new_token)
+                    last = match.end()
+                    changes += count
+            pos = match.end()
+        elif frame and state not in (_VALUE_OR_END, _VALUE):
+            raise invalid()
+        else:
+            path = value_path()
+            exhausted = occurrences is not None and bisect_left(occurrences, pos) == len(occurrences)
+            if exhausted or not selector.reaches(path):
+                pos = _skip_value(text, pos)
+                value_done()
+            elif char == '{':
+                stack.append(['obj', path, None, _KEY_OR_END])
+                pos += 1
+            elif char == '[':
+                stack.append(['arr', path, 0, _VALUE_OR_END])
+                pos += 1
+            elif char == '"':
+                match = _STRING.match(text, pos)
+                if not match:
+                    raise invalid()
+                if selector.selects(path):
+                    new_token, count = _rewrite_json_string(match.group(), transform)
+                    if count:
+                        out.append(text[last:pos])
+                        out.append(new_token)
+                        last = match.end()
+                        changes += count
+                pos = match.end()
+                value_done()
+            else:
+                pos = _scalar_end(text, pos)
+                value_done()
+        pos = _WS.match(text, pos).end()
+
+    if stack:
+        raise ValueError('JSON inválido: documento truncado')
+    if not changes:
+        return text, 0
+    out.append(text[last:])
+    return ''.join(out), changes
+
+
+# --------------------------------------------------------------------------
+# YAML (estilo bloco, como docker-compose.yml e render.yaml, e fluxo de uma linha)
+# --------------------------------------------------------------------------
+
+_YAML_LINE = re.compile(
+    r'(?P<indent> *)(?P<dashes>(?:-(?: +|$))*)'
+    r'(?:(?P<key>"(?:[^"\\]|\\.)*"|\'(?:[^\']|\'\')*\'|[^\s#\'"{\[\-][^#]*?|-[^\s#][^#]*?) *:(?= |$))?'
+    r'(?P<rest>.*)$'
+)
+_YAML_PREFIX = re.compile(r' *(?:[&!][^ ]* +)*')
+_YAML_SINGLE = re.compile(r"'(?:[^']|'')*'")
+_YAML_TRAILING = re.compile(r' *(?:(#)|$)')
+
+
+def _yaml_trailing(line: str, end: int) -> int:
+    """Início do comentário depois de um valor; ValueError se sobrar outra coisa"""
+    match = _YAML_TRAILING.match(line, end)
+    if match is None:
+        raise ValueError(f'YAML: conteúdo inesperado na coluna {end + 1}')
+    return match.end() - 1 if match.group(1) else len(line)
+
+
+def _yaml_value_span(line: str, start: int) -> Tuple[int, int, int]:
+    """
+    (início, fim) do escalar a partir de `start` e início do comentário.
+    ValueError para o que não é um escalar de uma linha só (string entre
+    aspas que continua na linha seguinte, `: ` no meio de um escalar
+    simples, indicadores reservados).
+    """
+    start = _YAML_PREFIX.match(line, start).end()
+    if start >= len(line):
+        return start, start, len(line)
+    char = line[start]
+    if char in '"\'':
+        match = (_STRING if char == '"' else _YAML_SINGLE).match(line, start)
+        if match is None:
+            raise ValueError(f'YAML: string sem fechamento na coluna {start + 1}')
+        return start, match.end(), _yaml_trailing(line, match.end())
+    if char == '#':
+        return start, start, start
+    if char in '{[]},%@`' or (char in '-?:' and line[start + 1:start + 2] in ('', ' ')):
+        raise ValueError(f'YAML: valor não suportado na coluna {start + 1}')
+    comment = line.find(' #', start)
+    end = comment if comment != -1 else len(line)
+    end = len(line[:end].rstrip())
+    scalar = line[start:end]
+    if ': ' in scalar or scalar.endswith(':'):
+        raise ValueError(f'YAML: `:` dentro de um escalar na coluna {start + 1}')
+    comment = line.find('#', end)
+    return start, end, comment if comment != -1 else len(line)
+
+
+def _yaml_flow_plain(line: str, start: int) -> int:
+    """Fim de um escalar simples dentro de uma coleção de fluxo"""
+    end = start
+    while end < len(line):
+        char = line[end]
+        if char in ',[]{}':
+            break
+        if char == ':' and line[end + 1:end + 2] in ('', ' ', ',', '[', ']', '{', '}'):
+            break
+        if char == '#' and line[end - 1] == ' ':
+            break
+        end += 1
+    return len(line[:end].rstrip(' '))
+
+
+def _yaml_flow(line: str, start: int) -> Tuple[List[Tuple[int, int, Path_, bool]], int]:
+    """
+    Escalares de uma coleção de fluxo (`{...}`, `[...]`) aberta em `start`:
+    (início, fim, caminho relativo, é chave?) e a posição depois do
+    fechamento. Só coleções que fecham na mesma linha; ValueError para o
+    resto (várias linhas, chaves complexas, pares soltos em listas).
+    """
+    spans: List[Tuple[int, int, Path_, bool]] = []
+    # Cada frame: [fechamento, caminho, chave ou índice atual]
+    frames: List[list] = []
+    state = _VALUE
+    pos = start
+
+    def invalid() -> ValueError:
+        return ValueError(f'YAML: coleção de fluxo inválida na coluna {pos + 1}')
+
+    while True:
+        pos = _YAML_PREFIX.match(line, pos).end()
+        if pos >= len(line) or line[pos] == '#':
+            raise ValueError('YAML: coleção de fluxo em várias linhas')
+        char = line[pos]
+        frame = frames[-1] if frames else None
+
+        if state == _NEXT or (state == _VALUE and frame and char in ',}'):
+            # (`{a: }` e `{a:, b}`: valor nulo)
+            if char == ',':
+                pos += 1
+                if frame[0] == ']':
+                    frame[2] += 1
+                    state = _VALUE_OR_END
+                else:
+                    state = _KEY_OR_END
+                continue
+            if char != frame[0]:
+                raise invalid()
+            frames.pop()
+            pos += 1
+            if not frames:
+                return spans, pos
+            state = _NEXT
+            continue
+        if state == _COLON:
+            if char == ':':
+                pos += 1
+                state = _VALUE
+            elif char in ',}':
+                state = _NEXT  # chave sem valor
+            else:
+                raise invalid()
+            continue
+        if char in ']}' and state != _VALUE:
+            state = _NEXT
+            continue
+
+        is_key = state == _KEY_OR_END
+        if frame is None:
+            path: Path_ = ()
+        elif frame[0] == ']':
+            path = frame[1] + (str(frame[2]),)
+        elif is_key:
+            path = frame[1]
+        else:
+            path = frame[1] + (frame[2],)
+        if char in '[{':
+            if is_key:
+                raise invalid()
+            frames.append([']', path, 0] if char == '[' else ['}', path, None])
+            state = _VALUE_OR_END if char == '[' else _KEY_OR_END
+            pos += 1
+            continue
+        if char in '"\'':
+            match = (_STRING if char == '"' else _YAML_SINGLE).match(line, pos)
+            if match is None:
+                raise ValueError('YAML: string de fluxo em várias linhas')
+            end = match.end()
+        elif char in '|>%@`' or (char in '-?:' and line[pos + 1:pos + 2] in ('', ' ')):
+            raise invalid()
+        else:
+            end = _yaml_flow_plain(line, pos)
+            if end == pos:
+                raise invalid()
+        if is_key:
+            frame[2] = _key_text(line[pos:end])
+            spans.append((pos, end, path + (frame[2],), True))
+            state = _COLON
+        else:
+            spans.append((pos, end, path, False))
+            state = _NEXT
+        pos = end
+
+
+def _key_text(key: str) -> str:
+    if key[:1] in '"\'':
+        try:
+            return json.loads(key) if key[0] == '"' else key[1:-1].replace("''", "'")
+        except ValueError:
+            return key
+    return key
+
+
+def transform_yaml(text: str, transform: Transform, selector: PathSelector,
+                   needles: Optional[Iterable[str]] = None) -> Tuple[str, int]:
+    """
+    Reescreve apenas chaves/escalares/comentários selecionados de um YAML.
+    Coleções de fluxo (`[...]`, `{...}`) são percorridas quando fecham na
+    mesma linha; o que o scanner não consegue estruturar levanta ValueError
+    (e o arquivo cai no modo texto) em vez de ser reescrito às cegas.
+    """
+    occurrences = _occurrences(text, needles)
+    if occurrences == []:
+        return text, 0
+    lines = text.splitlines(keepends=True)
+    offset = 0
+    changes = 0
+    # Cada entrada: [coluna, segmento, tipo ('key'|'item'), bloco aberto?]
+    stack: List[list] = []
+    block: Optional[Tuple[int, Path_]] = None   # escalar | ou > em curso
+    skip_below: Optional[int] = None            # subárvore excluída em curso
+
+    def rewrite(line: str, start: int, end: int) -> str:
+        nonlocal changes
+        if end <= start:
+            return line
+        new_text, count = transform(line[start:end])
+        if not count:
+            return line
+        changes += count
+        return line[:start] + new_text + line[end:]
+
+    def rewrite_flow(line: str, start: int, path: Path_) -> str:
+        spans, end = _yaml_flow(line, start)
+        comment = _yaml_trailing(line, end)
+        if selector.comments and comment < len(line):
+            line = rewrite(line, comment, len(line))
+        # Da direita para a esquerda, para as posições seguintes não mudarem
+        for span_start, span_end, span_path, is_key in reversed(spans):
+            span_path = path + span_path
+            if any(selector.excludes(span_path[:size]) for size in range(len(path) + 1, len(span_path) + 1)):
+                continue
+            if (selector.keys or not is_key) and selector.selects(span_path):
+                line = rewrite(line, span_start, span_end)
+        return line
+
+    for number, line in enumerate(lines):
+        line_start, offset = offset, offset + len(line)
+        if occurrences is not None and bisect_left(occurrences, line_start) == len(occurrences):
+            break
+        body = line.rstrip('\r\n')
+        newline = line[len(body):]
+        stripped = body.lstrip(' ')
+        indent = len(body) - len(stripped)
+
+        if not stripped:
+            continue
+        if skip_below is not None:
+            if indent > skip_below:
+                continue
+            skip_below = None
+        if block is not None:
+            if indent > block[0]:
+                if selector.selects(block[1]):
+                    lines[number] = rewrite(body, indent, len(body)) + newline
+                continue
+            block = None
+        if stripped.startswith('#'):
+            if selector.comments:
+                lines[number] = rewrite(body, indent, len(body)) + newline
+            continue
+        if stripped in ('---', '...') or stripped.startswith('--- ') or stripped.startswith('%'):
+            stack = []
+            continue
+
+        match = _YAML_LINE.match(body)
+        dashes = match.group('dashes')
+
+        previous_item = None
+        while stack:
+            column, _, kind, opened = stack[-1]
+            if column > indent or (column == indent and not (dashes and kind == 'key' and opened)):
+                popped = stack.pop()
+                if popped[2] == 'item' and popped[0] == indent:
+                    previous_item = popped
+                continue
+            break
+
+        column = indent
+        for position, dash in enumerate(re.finditer(r'-(?: +|$)', dashes)):
+            index = int(previous_item[1]) + 1 if position == 0 and previous_item else 0
+            stack.append([indent + dash.start(), str(index), 'item', False])
+            column = indent + dash.end()
+
+        path = tuple(entry[1] for entry in stack)
+        key = match.group('key')
+        start = len(body) - len(match.group('rest'))
+        flow = _YAML_PREFIX.match(body, start).end()
+        flow = flow if body[flow:flow + 1] in ('{', '[') else None
+        if key is not None:
+            key_start = column
+            key_end = key_start + len(key)
+            path = path + (_key_text(key),)
+            if flow is None:
+                value_start, value_end, comment = _yaml_value_span(body, start)
+            opened = flow is None and value_start >= value_end
+            stack.append([column, path[-1], 'key', opened])
+
+            if selector.excludes(path) or not (selector.comments or selector.reaches(path)):
+                skip_below = column
+                continue
+            if flow is not None:
+                new_body = rewrite_flow(body, flow, path)
+            else:
+                new_body = body
+                if selector.comments and comment < len(body):
+                    new_body = rewrite(new_body, comment, len(body))
+                scalar = body[value_start:value_end]
+                if scalar[:1] in ('|', '>'):
+                    block = (column, path)
+                elif not opened and selector.selects(path):
+                    new_body = rewrite(new_body, value_start, value_end)
+            if selector.keys and selector.selects(path):
+                new_body = rewrite(new_body, key_start, key_end)
+            lines[number] = new_body + newline
+        else:
+            if not dashes:
+                # Escalar continuado de uma linha anterior, documento que é só
+                # um escalar etc.: sem caminho confiável, o arquivo vai para o
+                # modo texto
+                raise ValueError(f'YAML: linha {number + 1} sem chave nem item de lista')
+            if selector.excludes(path):
+                continue
+            if flow is not None:
+                lines[number] = rewrite_flow(body, flow, path) + newline
+                continue
+            value_start, value_end, comment = _yaml_value_span(body, start)
+            new_body = body
+            if selector.comments and comment < len(body):
+                new_body = rewrite(new_body, comment, len(body))
+            if body[value_start:value_end][:1] in ('|', '>'):
+                block = (column, path)
+            elif selector.selects(path):
+                new_body = rewrite(new_body, value_start, value_end)
+            lines[number] = new_body + newline
+
+    return (''.join(lines), changes) if changes else (text, 0)
+
+
+def transform_structured(file_path: Path, text: str, transform: Transform,
+                         selector: PathSelector, needles: Optional[Iterable[str]] = None) -> Tuple[str, int]:
+    """Despacha pelo sufixo; levanta ValueError se o arquivo não for parseável"""
+    suffix = Path(file_path).suffix
+    if suffix == '.json':
+        return transform_json(text, transform, selector, needles)
+    if suffix in ('.yml', '.yaml'):
+        return transform_yaml(text, transform, selector, needles)
+    raise ValueError(f'Formato não suportado: {suffix}')
@@ -8,12 +8,14 @@ Este script:
 2. Atualiza TODOS os imports automaticamente
 3. Mantém histórico de mudanças
 """
-import os
-import re
+import argparse
 import shutil
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from oxy_transform.packs import load_bundle
+from oxy_transform.runner import Runner, add_runner_args, walk
+
 # Mapeamento de renomeações
 FILE_RENAMES = {
     # Backend Services
@@ -43,34 +45,19 @@ FILE_RENAMES = {
     'mobile/hooks/usePets.ts': 'mobile/hooks/usePatients.ts',
 }
 
-# Padrões de import a serem atualizados
-IMPORT_PATTERNS = [
-    # Pets → Patients
-    (r"from ['\"](.*)\/pets\.service['\"]", r"from '\1/patients.service'"),
-    (r"from ['\"](.*)\/pets\/pets\.service['\"]", r"from '\1/patients/patients.service'"),
-    (r"import.*usePets.*from ['\"](.*)\/usePets['\"]", r"import { usePatients } from '\1/usePatients'"),
-    
-    # Aurora → OxyAssistant
-    (r"from ['\"](.*)\/aurora\.service['\"]", r"from '\1/oxy-assistant.service'"),
-    (r"from ['\"](.*)\/aurora\/aurora\.service['\"]", r"from '\1/oxy-assistant/oxy-assistant.service'"),
-    (r"from ['\"](.*)\/aurora-proactive\.service['\"]", r"from '\1/oxy-assistant-proactive.service'"),
-    
-    # Client AI → Patient AI  
-    (r"from ['\"](.*)\/client-ai\.service['\"]", r"from '\1/patient-ai.service'"),
-    
-    # Routes
-    (r"from ['\"](.*)\/pets\.routes['\"]", r"from '\1/patients.routes'"),
-    (r"from ['\"](.*)\/aurora\.routes['\"]", r"from '\1/oxy-assistant.routes'"),
-]
+# Padrões de import a serem atualizados (rules/imports.toml), seguidos de
+# usePets → usePatients
+IMPORTS = load_bundle('imports')
+IMPORT_PATTERN_IDS = {rule.id for rule in IMPORTS.pack.rules_of('IMPORT_PATTERNS')}
 
 # Pastas a ignorar
 IGNORE_DIRS = {'node_modules', '.git', 'dist', 'build', '__pycache__'}
 
 base_dir = Path('/Users/saraiva/oxy')
 
-def rename_files():
-    """Renomeia arquivos e diretórios"""
-    print("📁 FASE 1.1: Renomeando arquivos...\n")
+def rename_files(runner: Runner):
+    """Renomeia arquivos e diretórios (no dry-run, só registra no patch)"""
+    print("📁 FASE 1.1: Renomeando arquivos...\n", file=runner.out)
     
     renamed = []
     
@@ -79,95 +66,76 @@ def rename_files():
         new_full = base_dir / new_path
         
         if old_full.exists():
+            if runner.diff:
+                # Vira `rename from`/`rename to` no patch, junto com os imports
+                runner.diff.rename(old_full, new_full)
+                renamed.append((old_path, new_path))
+                print(f"🔎 {old_path} → {new_path} (dry-run)", file=runner.out)
+                continue
+            
             # Criar diretório pai se não existir
             new_full.parent.mkdir(parents=True, exist_ok=True)
             
             # Renomear
             shutil.move(str(old_full), str(new_full))
             renamed.append((old_path, new_path))
-            print(f"✅ {old_path} → {new_path}")
+            print(f"✅ {old_path} → {new_path}", file=runner.out)
         else:
-            print(f"⚠️  Não encontrado: {old_path}")
+            print(f"⚠️  Não encontrado: {old_path}", file=runner.out)
     
-    print(f"\n📊 Total renomeado: {len(renamed)} arquivos/diretórios\n")
+    print(f"\n📊 Total renomeado: {len(renamed)} arquivos/diretórios\n", file=runner.out)
     return renamed
 
-def update_imports_in_file(file_path: Path) -> int:
-    """Atualiza imports em um arquivo"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original = content
-        changes = 0
-        
-        # Aplicar padrões de import
-        for pattern, replacement in IMPORT_PATTERNS:
-            content, count = re.subn(pattern, replacement, content)
-            changes += count
-        
-        # Atualizar referências a usePets → usePatients
-        content = content.replace('usePets', 'usePatients')
-        
-        # Salvar se houver mudanças
-        if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return changes
-        
-        return 0
-        
-    except Exception as e:
-        print(f"❌ Erro em {file_path}: {e}")
-        return 0
+def update_imports(file_path: Path, content: str) -> Tuple[str, int, Dict[str, int]]:
+    """Atualiza imports no conteúdo de um arquivo"""
+    content, hits = IMPORTS.apply(content)
+    
+    # Mudanças contam só imports; usePets → usePatients aparece em `hits`
+    changes = sum(count for rule_id, count in hits.items() if rule_id in IMPORT_PATTERN_IDS)
+    
+    return content, changes, hits
 
-def update_all_imports():
+def update_all_imports(runner: Runner):
     """Atualiza imports em todos os arquivos"""
-    print("🔄 FASE 1.2: Atualizando imports...\n")
+    print("🔄 FASE 1.2: Atualizando imports...\n", file=runner.out)
     
     extensions = {'.ts', '.tsx', '.js', '.jsx'}
-    files_updated = 0
-    total_changes = 0
+    summary = runner.run(walk(base_dir, IGNORE_DIRS, lambda path: path.suffix in extensions))
     
-    for root, dirs, files in os.walk(base_dir):
-        # Remover diretórios ignorados
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        
-        for file in files:
-            if Path(file).suffix in extensions:
-                file_path = Path(root) / file
-                changes = update_imports_in_file(file_path)
-                
-                if changes > 0:
-                    files_updated += 1
-                    total_changes += changes
-                    print(f"✅ {file_path.relative_to(base_dir)} ({changes} imports)")
-    
-    print(f"\n📊 Resumo:")
-    print(f"   Arquivos atualizados: {files_updated}")
-    print(f"   Total de imports corrigidos: {total_changes}\n")
+    print(f"\n📊 Resumo:", file=runner.out)
+    print(f"   Arquivos atualizados: {summary.changed}", file=runner.out)
+    print(f"   Total de imports corrigidos: {summary.changes}\n", file=runner.out)
 
 def main():
     """Executa FASE 1 completa"""
-    print("=" * 60)
-    print("🚀 FASE 1: Renomeação de Arquivos e Atualização de Imports")
-    print("=" * 60)
-    print()
+    parser = argparse.ArgumentParser(description='FASE 1: Renomeação de arquivos e atualização de imports')
+    add_runner_args(parser)
+    args = parser.parse_args()
+    runner = Runner.from_args(args, base_dir, update_imports,
+                              label=lambda result: f"✅ {result.path} ({result.changes} imports)",
+                              line_local=lambda path: IMPORTS.line_local,
+                              cache_key=lambda path: IMPORTS.pack.digest)
+    
+    print("=" * 60, file=runner.out)
+    print("🚀 FASE 1: Renomeação de Arquivos e Atualização de Imports", file=runner.out)
+    print("=" * 60, file=runner.out)
+    print(file=runner.out)
     
     # 1.1 Renomear arquivos
-    renamed = rename_files()
+    renamed = rename_files(runner)
     
     # 1.2 Atualizar imports
-    update_all_imports()
-    
-    print("=" * 60)
-    print("✨ FASE 1 CONCLUÍDA COM SUCESSO!")
-    print("=" * 60)
-    print()
-    print("📝 Próximos passos:")
-    print("   1. Verificar se o TypeScript compila sem erros")
-    print("   2. Testar dev server")
-    print("   3. Prosseguir para FASE 2 (Database Migration)")
+    update_all_imports(runner)
+    runner.close()
+    
+    print("=" * 60, file=runner.out)
+    print("✨ FASE 1 CONCLUÍDA COM SUCESSO!", file=runner.out)
+    print("=" * 60, file=runner.out)
+    print(file=runner.out)
+    print("📝 Próximos passos:", file=runner.out)
+    print("   1. Verificar se o TypeScript compila sem erros", file=runner.out)
+    print("   2. Testar dev server", file=runner.out)
+    print("   3. Prosseguir para FASE 2 (Database Migration)", file=runner.out)
 
 if __name__ == '__main__':
     main()
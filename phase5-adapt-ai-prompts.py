@@ -3,58 +3,24 @@
 FASE 5: Adaptação de AI Prompts
 Adapta todos os prompts de IA para contexto médico/hospitalar
 """
+import argparse
 import re
 from pathlib import Path
 
+from oxy_transform.packs import load_bundle
+from oxy_transform.runner import Runner, add_runner_args
+
 base_dir = Path('/Users/saraiva/oxy')
 
-# Mapeamento de contexto veterinário → médico nos prompts
-PROMPT_TRANSFORMATIONS = {
-    # Referências gerais
-    r'patients e tutores': 'pacientes e responsáveis',
-    r'tutores': 'responsáveis',
-    r'tutor': 'responsável',
-    r'clientes com carinho': 'pacientes com empatia e cuidado',
-    r'Cadastrar patients': 'Cadastrar pacientes',
-    r'patients automaticamente': 'pacientes automaticamente',
-    r'carinho do {patient}': 'do paciente {patient}',
-    r'banho do {patient}': 'consulta do(a) {patient}',
-    r'Vamos marcar o banho': 'Vamos agendar a consulta',
-    r'Vou já cadastrar o {patient}': 'Vou cadastrar o(a) paciente {patient}',
-    r'patients e tutores': 'pacientes',
-    
-    # Serviços veterinários → médicos
-    r'banho e tosa': 'consultas médicas',
-    r'vacinas': 'imunizações',
-    r'consulta veterinária': 'consulta médica',
-    r'veterinário': 'médico',
-    r'veterinária': 'médica',
-    
-    # Avisos e disclaimers médicos
-    r'NUNCA forneça diagnósticos': 
-        'NUNCA forneça diagnósticos médicos ou prescreva medicamentos',
-    r'SEMPRE recomende consulta presencial':
-        'SEMPRE recomende consulta presencial para questões de saúde',
-}
+# Mapeamento de contexto veterinário → médico nos prompts (rules/*-prompts.toml)
+PATIENT_AI_PROMPTS = load_bundle('patient-ai-prompts')
+OXY_ASSISTANT_PROMPTS = load_bundle('oxy-assistant-prompts')
 
-def adapt_patient_ai_prompts():
-    """Adapta prompts do Patient AI"""
-    print("🔄 Adaptando Patient AI prompts...\n")
-    
-    file_path = base_dir / 'backend/src/services/ai/patient-ai.service.ts'
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    original = content
-    changes = 0
-    
-    # Aplicar transformações
-    for pattern, replacement in PROMPT_TRANSFORMATIONS.items():
-        new_content = re.sub(pattern, replacement, content)
-        if new_content != content:
-            changes += 1
-            content = new_content
+def transform_patient_ai(file_path: Path, content: str):
+    """Adapta o conteúdo dos prompts do Patient AI"""
+    # Aplicar transformações (uma mudança por padrão aplicado)
+    content, hits = PATIENT_AI_PROMPTS.apply(content)
+    changes = len(hits)
     
     # Substituições específicas de contexto médico
     medical_context = """CONTEXTO MÉDICO IMPORTANTE:
@@ -80,50 +46,24 @@ SOBRE OS PACIENTES:
         content
     )
     
-    # Salvar
-    if content != original:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"✅ Patient AI prompts adaptados ({changes} mudanças)")
-    
-    return changes
+    return content, changes, hits
 
-def adapt_oxy_assistant_prompts():
-    """Adapta prompts do Oxy Assistant"""
-    print("\n🔄 Adaptando Oxy Assistant prompts...\n")
+def adapt_patient_ai_prompts(runner: Runner):
+    """Adapta prompts do Patient AI"""
+    print("🔄 Adaptando Patient AI prompts...\n", file=runner.out)
     
-    file_path = base_dir / 'backend/src/services/oxy-assistant/oxy_assistant.service.ts'
+    file_path = base_dir / 'backend/src/services/ai/patient-ai.service.ts'
     
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except FileNotFoundError:
-        # Tentar caminho alternativo
-        file_path = base_dir / 'backend/src/services/oxy-assistant/aurora.service.ts'
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    
-    original = content
-    changes = 0
-    
-    # Transformações específicas do Oxy Assistant
-    oxy_transformations = {
-        r'Dr\(a\)\. {ownerName}': 'Dr(a). {ownerName}',
-        r'petshop': 'clínica médica',
-        r'Petshop': 'Clínica Médica',
-        r'pets cadastrados': 'pacientes cadastrados',
-        r'pacientes prioritários': 'pacientes prioritários',
-        r'PATIENTS PRIORITÁRIOS': 'PACIENTES PRIORITÁRIOS',
-        r'Último atendimento': 'Última consulta',
-        r'patients em risco': 'pacientes em risco',
-        r'proativas de campanhas': 'proativas de saúde preventiva',
-    }
-    
-    for pattern, replacement in oxy_transformations.items():
-        new_content = re.sub(pattern, replacement, content)
-        if new_content != content:
-            changes += 1
-            content = new_content
+    summary = runner.run([file_path], transform=transform_patient_ai,
+                         label=lambda result: f"✅ Patient AI prompts adaptados ({result.changes} mudanças)")
+    
+    return summary.changes
+
+def transform_oxy_assistant(file_path: Path, content: str):
+    """Adapta o conteúdo dos prompts do Oxy Assistant"""
+    # Transformações específicas do Oxy Assistant (uma mudança por padrão aplicado)
+    content, hits = OXY_ASSISTANT_PROMPTS.apply(content)
+    changes = len(hits)
     
     # Adicionar contexto hospitalar
     clinical_context = """
@@ -158,31 +98,49 @@ RESPONSABILIDADES ÉTICAS:
         )
         changes += 1
     
-    # Salvar
-    if content != original:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"✅ Oxy Assistant prompts adaptados ({changes} mudanças)")
+    return content, changes, hits
+
+def adapt_oxy_assistant_prompts(runner: Runner):
+    """Adapta prompts do Oxy Assistant"""
+    print("\n🔄 Adaptando Oxy Assistant prompts...\n", file=runner.out)
+    
+    file_path = base_dir / 'backend/src/services/oxy-assistant/oxy_assistant.service.ts'
     
-    return changes
+    if not file_path.exists():
+        # Tentar caminho alternativo
+        file_path = base_dir / 'backend/src/services/oxy-assistant/aurora.service.ts'
+    
+    summary = runner.run([file_path], transform=transform_oxy_assistant,
+                         label=lambda result: f"✅ Oxy Assistant prompts adaptados ({result.changes} mudanças)")
+    
+    return summary.changes
 
 def main():
     """Executa FASE 5"""
-    print("=" * 60)
-    print("🚀 FASE 5: Adaptação de AI Prompts para Contexto Médico")
-    print("=" * 60)
-    print()
+    parser = argparse.ArgumentParser(description='FASE 5: Adaptação de AI prompts para contexto médico')
+    add_runner_args(parser)
+    args = parser.parse_args()
+    
+    # Cada função escolhe a transformação do seu arquivo
+    runner = Runner.from_args(args, base_dir, None,
+                              cache_key=lambda path: PATIENT_AI_PROMPTS.pack.digest + OXY_ASSISTANT_PROMPTS.pack.digest)
+    
+    print("=" * 60, file=runner.out)
+    print("🚀 FASE 5: Adaptação de AI Prompts para Contexto Médico", file=runner.out)
+    print("=" * 60, file=runner.out)
+    print(file=runner.out)
     
-    patient_ai_changes = adapt_patient_ai_prompts()
-    oxy_assistant_changes = adapt_oxy_assistant_prompts()
+    patient_ai_changes = adapt_patient_ai_prompts(runner)
+    oxy_assistant_changes = adapt_oxy_assistant_prompts(runner)
+    runner.close()
     
     total = patient_ai_changes + oxy_assistant_changes
     
-    print("\n" + "=" * 60)
-    print(f"📊 Total de adaptações: {total}")
-    print("=" * 60)
-    print("\n✨ FASE 5 CONCLUÍDA!")
-    print("\n📝 Próximo: FASE 6 - LGPD Compliance")
+    print("\n" + "=" * 60, file=runner.out)
+    print(f"📊 Total de adaptações: {total}", file=runner.out)
+    print("=" * 60, file=runner.out)
+    print("\n✨ FASE 5 CONCLUÍDA!", file=runner.out)
+    print("\n📝 Próximo: FASE 6 - LGPD Compliance", file=runner.out)
 
 if __name__ == '__main__':
     main()
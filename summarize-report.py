@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Resumo de relatórios JSONL gerados com --report
+
+Lê um ou mais relatórios (ou stdin) linha a linha e agrega totais de
+arquivos, mudanças, bytes, tempo e as regras mais aplicadas. Várias
+execuções (ex.: todas as fases) podem ser somadas em um único resumo.
+"""
+import argparse
+import json
+import sys
+from contextlib import ExitStack
+
+from oxy_transform.report import read_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Agrega relatórios JSONL dos scripts de transformação')
+    parser.add_argument('reports', nargs='*', default=['-'], help="Relatórios JSONL ('-' = stdin)")
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    parser.add_argument('--top', type=int, default=10, help='Quantas regras listar (padrão: 10)')
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        streams = [sys.stdin if report == '-' else stack.enter_context(open(report, encoding='utf-8'))
+                   for report in args.reports]
+        summary = read_summary(streams)
+
+    if args.json:
+        print(json.dumps(summary.as_dict(), indent=2, ensure_ascii=False))
+        return
+
+    print("📊 Resumo do relatório:")
+    for line in summary.lines(args.top):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
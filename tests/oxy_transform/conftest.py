@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os scripts rodam da raiz do repositório; os testes importam oxy_transform de lá
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,65 @@
+"""
+Propriedade central do compilador: aplicar os grupos fundidos dá o mesmo
+resultado que aplicar as regras em sequência, para qualquer lista de regras
+"""
+import random
+import re
+
+import pytest
+
+from oxy_transform import Rule, apply_groups, apply_sequential, compile_rules
+from oxy_transform.packs import load_pipeline
+
+ALPHABET = 'ab-c '
+WORDS = ['a', 'b', 'ab', 'ac', 'abc', 'ca', 'pet', 'pets']
+
+
+def _text(rng, size):
+    return ''.join(rng.choice(ALPHABET) for _ in range(size))
+
+
+def _rule(rng, index):
+    """Regra aleatória: literais, remoções, grupos, classes, \\b e repetições"""
+    replacement = _text(rng, rng.choice([0, 0, 1, 2, 3]))
+    kind = rng.random()
+    if kind < 0.5:
+        return Rule(f'r{index}', _text(rng, rng.randint(1, 3)), replacement, 'literal')
+    if kind < 0.65:
+        left, middle, right = (re.escape(_text(rng, rng.randint(0, 1))) for _ in range(3))
+        template = rng.choice([r'\1', rf'{replacement}\1', rf'\1{replacement}'])
+        return Rule(f'r{index}', f'{left}({middle or "a"}){right}', template)
+    if kind < 0.8:
+        return Rule(f'r{index}', rf'\b{rng.choice(WORDS)}\b', replacement)
+    if kind < 0.9:
+        return Rule(f'r{index}', f'[{rng.choice(["ab", "bc", "a-"])}]{re.escape(_text(rng, 1))}', replacement)
+    return Rule(f'r{index}', f'{rng.choice("abc")}+', replacement)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_groups_match_sequential_on_random_rules(seed):
+    rng = random.Random(seed)
+    for _ in range(60):
+        rules = [_rule(rng, index) for index in range(rng.randint(2, 6))]
+        groups = compile_rules(rules).groups
+        for _ in range(20):
+            content = _text(rng, rng.randint(0, 12))
+            assert apply_groups(groups, content)[0] == apply_sequential(rules, content), (rules, content)
+
+
+def test_deletion_joins_neighbours():
+    rules = [Rule('d', '-', '', 'literal'), Rule('r', 'ac', 'X', 'literal')]
+    groups = compile_rules(rules).groups
+    assert len(groups) == 2
+    assert apply_groups(groups, 'a-c')[0] == apply_sequential(rules, 'a-c') == 'X'
+
+
+def test_pipeline_groups_match_sequential():
+    rules = load_pipeline()
+    groups = compile_rules(rules).groups
+    vocabulary = sorted({token for rule in rules
+                         for token in re.findall(r"[\w\-/.'@]+", rule.pattern + ' ' + rule.replacement)})
+    vocabulary += [' ', '\n', "'", '"', '/', '.', '-', "from '", 'import ', '../', '@/']
+    rng = random.Random(0)
+    for _ in range(3000):
+        content = ''.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 12)))
+        assert apply_groups(groups, content)[0] == apply_sequential(rules, content), content
@@ -0,0 +1,38 @@
+"""
+Modo estruturado: o que o scanner de YAML não estrutura tem que levantar
+ValueError (fallback para o modo texto), nunca ser reescrito às cegas.
+"""
+import re
+
+import pytest
+
+from oxy_transform.structured import PathSelector, transform_yaml
+
+
+def _auzap(text):
+    return re.subn('auzap', 'oxy', text)
+
+
+@pytest.mark.parametrize('text', [
+    'a: 1\n  bad: : [\n',
+    'x: [auzap,\n  b]\n',
+    'x: "auzap\n  y"\n',
+    'x: auzap\n  continua\n',
+    'x: [a: auzap]\n',
+    'x: "auzap" sobra\n',
+])
+def test_unstructured_yaml_raises(text):
+    with pytest.raises(ValueError):
+        transform_yaml(text, _auzap, PathSelector())
+
+
+@pytest.mark.parametrize('text, selector, expected', [
+    ('x: {auzap: 1}\n', PathSelector(keys=False), 'x: {auzap: 1}\n'),
+    ('x: {a: auzap, b: auzap}\n', PathSelector(include=['x.a']), 'x: {a: oxy, b: auzap}\n'),
+    ('x: {a: auzap}\n', PathSelector(exclude=['x.a']), 'x: {a: auzap}\n'),
+    ('- [auzap, b]\n- auzap\n', PathSelector(include=['1']), '- [auzap, b]\n- oxy\n'),
+    ("x: [auzap, 'auzap', {k: \"auzap\"}] # auzap\n", PathSelector(comments=True),
+     "x: [oxy, 'oxy', {k: \"oxy\"}] # oxy\n"),
+])
+def test_flow_collections_follow_selector(text, selector, expected):
+    assert transform_yaml(text, _auzap, selector)[0] == expected
@@ -3,16 +3,17 @@
 Script para transformação em massa: AuZap → Oxy
 Substitui todas as referências mantendo case-sensitivity
 """
-import os
+import argparse
 import re
+import sys
 from pathlib import Path
 
-# Mapeamento de substituições
-REPLACEMENTS = {
-    'AuZap': 'Oxy',
-    'auzap': 'oxy',
-    'AUZAP': 'OXY',
-}
+from oxy_transform.packs import load_bundle
+from oxy_transform.runner import Runner, add_runner_args, walk
+from oxy_transform.structured import SUFFIXES as STRUCTURED_SUFFIXES, PathSelector, transform_structured
+
+# Mapeamento de substituições (rules/branding.toml)
+REPLACEMENTS = load_bundle('branding')
 
 # Pastas a ignorar
 IGNORE_DIRS = {
@@ -26,6 +27,9 @@ EXTENSIONS = {
     '.html', '.css', '.txt', '.yml', '.yaml'
 }
 
+# Modo estruturado (--structured): subárvores que nunca devem ser reescritas
+STRUCTURED_SKIP = ['**.integrity']
+
 def should_process(file_path):
     """Verifica se o arquivo deve ser processado"""
     # Ignora node_modules e outras pastas
@@ -36,56 +40,69 @@ def should_process(file_path):
     # Apenas extensões específicas
     return Path(file_path).suffix in EXTENSIONS
 
-def transform_file(file_path):
-    """Transforma um arquivo aplicando todas as substituições"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original_content = content
-        
-        # Aplica substituições
-        for old, new in REPLACEMENTS.items():
-            content = content.replace(old, new)
-        
-        # Só escreve se houver mudanças
-        if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        
-        return False
+def apply_replacements(content, hits=None):
+    """Aplica REPLACEMENTS em um texto, contando matches por regra em `hits`"""
+    content, counts = REPLACEMENTS.apply(content)
+    if hits is not None:
+        for key, count in counts.items():
+            hits[key] = hits.get(key, 0) + count
+    return content, sum(counts.values())
+
+def transform_content(file_path, content, selector=None):
+    """Transforma o conteúdo de um arquivo aplicando todas as substituições"""
+    hits = {}
+    apply = lambda text: apply_replacements(text, hits)
     
-    except Exception as e:
-        print(f"❌ Erro em {file_path}: {e}")
-        return False
+    # JSON/YAML no modo estruturado: só chaves/valores selecionados
+    if selector is not None and Path(file_path).suffix in STRUCTURED_SUFFIXES:
+        try:
+            content, changes = transform_structured(file_path, content, apply, selector, REPLACEMENTS.needles)
+            return content, changes, hits
+        except ValueError as e:
+            print(f"⚠️  {file_path}: {e} (usando modo texto)", file=sys.stderr)
+            hits.clear()
+    
+    # Aplica substituições
+    content, changes = apply(content)
+    return content, changes, hits
 
 def main():
     """Processa todos os arquivos recursivamente"""
+    parser = argparse.ArgumentParser(description='Transformação em massa: AuZap → Oxy')
+    parser.add_argument('--structured', action='store_true',
+                        help='JSON/YAML: reescreve só chaves/valores selecionados, preservando a formatação')
+    parser.add_argument('--paths', nargs='+', default=['**'], metavar='PADRÃO',
+                        help="Caminhos selecionados no modo estruturado (ex.: 'scripts.*' 'services.*.image')")
+    parser.add_argument('--skip-paths', nargs='+', default=STRUCTURED_SKIP, metavar='PADRÃO',
+                        help='Subárvores puladas no modo estruturado (padrão: **.integrity)')
+    parser.add_argument('--no-keys', action='store_true', help='Modo estruturado: não reescreve chaves')
+    parser.add_argument('--no-comments', action='store_true', help='Modo estruturado: não reescreve comentários YAML')
+    add_runner_args(parser)
+    args = parser.parse_args()
+
+    selector = None
+    structured_key = ''
+    if args.structured:
+        selector = PathSelector(args.paths, args.skip_paths, keys=not args.no_keys, comments=not args.no_comments)
+        structured_key = repr((args.paths, args.skip_paths, args.no_keys, args.no_comments))
+
     base_dir = Path('/Users/saraiva/oxy')
-    files_processed = 0
-    files_changed = 0
+    runner = Runner.from_args(args, base_dir, lambda path, content: transform_content(path, content, selector),
+                              # O modo estruturado precisa do documento inteiro
+                              line_local=lambda path: REPLACEMENTS.line_local and (selector is None or path.suffix not in STRUCTURED_SUFFIXES),
+                              # transform_structured despacha pelo sufixo (JSON x YAML)
+                              cache_key=lambda path: REPLACEMENTS.pack.digest + (
+                                  structured_key + path.suffix if path.suffix in STRUCTURED_SUFFIXES else ''))
     
-    print("🚀 Iniciando transformação em massa: AuZap → Oxy\n")
+    print("🚀 Iniciando transformação em massa: AuZap → Oxy\n", file=runner.out)
     
-    for root, dirs, files in os.walk(base_dir):
-        # Remove diretórios ignorados da busca
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        
-        for file in files:
-            file_path = Path(root) / file
-            
-            if should_process(file_path):
-                files_processed += 1
-                
-                if transform_file(file_path):
-                    files_changed += 1
-                    print(f"✅ {file_path.relative_to(base_dir)}")
+    summary = runner.run(walk(base_dir, IGNORE_DIRS, should_process))
+    runner.close()
     
-    print(f"\n📊 Resumo:")
-    print(f"   Arquivos processados: {files_processed}")
-    print(f"   Arquivos modificados: {files_changed}")
-    print(f"\n✨ Transformação concluída!")
+    print(f"\n📊 Resumo:", file=runner.out)
+    print(f"   Arquivos processados: {summary.files}", file=runner.out)
+    print(f"   Arquivos modificados: {summary.changed}", file=runner.out)
+    print(f"\n✨ Transformação concluída!", file=runner.out)
 
 if __name__ == '__main__':
     main()
@@ -3,17 +3,21 @@
 Script para transformação de emojis: 🐾 → 🏥
 Transforma emojis de petshop para clínica médica
 """
-import os
+import argparse
+import time
 from pathlib import Path
 
-# Mapeamento de emojis
-EMOJI_MAP = {
-    '🐾': '🏥',  # Pata → Hospital
-    '🐶': '👤',  # Cachorro → Pessoa
-    '🐱': '👤',  # Gato → Pessoa
-    '🦴': '💊',  # Osso → Remédio
-    '🎾': '📋',  # Bolinha → Clipboard
-}
+from oxy_transform.emoji import EmojiMap
+from oxy_transform.packs import load_bundle
+from oxy_transform.runner import Runner, add_runner_args, walk
+
+# Mapeamento de emojis (rules/emojis.toml)
+EMOJI_RULES = load_bundle('emojis')
+EMOJI_MAP = {rule.pattern: rule.replacement for rule in EMOJI_RULES.rules}
+RULE_IDS = [rule.id for rule in EMOJI_RULES.rules]
+
+# Mapa compilado: uma passada por arquivo, respeitando VS16, tons de pele e ZWJ
+EMOJIS = EmojiMap(EMOJI_MAP)
 
 # Pastas a ignorar
 IGNORE_DIRS = {
@@ -34,50 +38,82 @@ def should_process(file_path):
         return False
     return Path(file_path).suffix in EXTENSIONS
 
-def transform_file(file_path):
-    """Transforma emojis em um arquivo"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original_content = content
-        
-        # Aplica substituições de emojis
-        for old_emoji, new_emoji in EMOJI_MAP.items():
+def transform_content(file_path, content):
+    """Transforma emojis no conteúdo de um arquivo (uma passada, por cluster)"""
+    content, counts = EMOJIS.apply(content)
+    hits = {RULE_IDS[index]: count for index, count in enumerate(counts) if count}
+    return content, sum(counts), hits
+
+def transform_content_loop(file_path, content):
+    """Modo antigo: um content.replace por entrada do mapa"""
+    changes = 0
+    hits = {}
+    
+    # Aplica substituições de emojis
+    for index, (old_emoji, new_emoji) in enumerate(EMOJI_MAP.items()):
+        count = content.count(old_emoji)
+        if count:
             content = content.replace(old_emoji, new_emoji)
-        
-        # Só escreve se houver mudanças
-        if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        
-        return False
+            changes += count
+            hits[RULE_IDS[index]] = count
     
-    except Exception as e:
-        print(f"❌ Erro em {file_path}: {e}")
-        return False
+    return content, changes, hits
+
+def benchmark(directory, repeat=20):
+    """Compara o modo compilado com o laço antigo nos arquivos de `directory`"""
+    files = []
+    for file_path in walk(Path(directory), IGNORE_DIRS, should_process):
+        try:
+            files.append((file_path, file_path.read_text(encoding='utf-8')))
+        except (UnicodeDecodeError, OSError):
+            continue
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in files)
+    print(f"⏱️  Benchmark em {directory}: {len(files)} arquivos, {total_bytes / 1_000_000:.2f} MB, {repeat} repetições\n")
+    
+    timings = {}
+    for name, transform in (('laço', transform_content_loop), ('compilado', transform_content)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for file_path, content in files:
+                transform(file_path, content)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        print(f"   {name:<10} {best * 1000:8.2f} ms  ({total_bytes / best / 1_000_000:.1f} MB/s)")
+    
+    differ = [str(file_path) for file_path, content in files
+              if transform_content(file_path, content)[0] != transform_content_loop(file_path, content)[0]]
+    print(f"\n   Speedup: {timings['laço'] / timings['compilado']:.2f}x")
+    print(f"   Arquivos com resultado diferente: {len(differ)}")
+    for path in differ[:10]:
+        print(f"      {path}")
 
 def main():
     """Processa todos os arquivos recursivamente"""
+    parser = argparse.ArgumentParser(description='Transformação de emojis: 🐾 → 🏥')
+    parser.add_argument('--loop', action='store_true',
+                        help='Usa o laço antigo (um replace por emoji, sem clusters)')
+    parser.add_argument('--benchmark', nargs='?', const='src/pages', metavar='DIR',
+                        help='Compara os dois modos em DIR (padrão: src/pages) sem gravar nada')
+    add_runner_args(parser)
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    
     base_dir = Path('/Users/saraiva/oxy')
-    files_changed = 0
+    runner = Runner.from_args(args, base_dir, transform_content_loop if args.loop else transform_content,
+                              line_local=lambda path: EMOJI_RULES.line_local,
+                              cache_key=lambda path: EMOJI_RULES.pack.digest)
     
-    print("🚀 Iniciando transformação de emojis: 🐾 → 🏥\n")
+    print("🚀 Iniciando transformação de emojis: 🐾 → 🏥\n", file=runner.out)
     
-    for root, dirs, files in os.walk(base_dir):
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        
-        for file in files:
-            file_path = Path(root) / file
-            
-            if should_process(file_path):
-                if transform_file(file_path):
-                    files_changed += 1
-                    print(f"✅ {file_path.relative_to(base_dir)}")
+    summary = runner.run(walk(base_dir, IGNORE_DIRS, should_process))
+    runner.close()
     
-    print(f"\n📊 Total de arquivos modificados: {files_changed}")
-    print(f"✨ Transformação de emojis concluída!")
+    print(f"\n📊 Total de arquivos modificados: {summary.changed}", file=runner.out)
+    print(f"✨ Transformação de emojis concluída!", file=runner.out)
 
 if __name__ == '__main__':
     main()